@@ -200,6 +200,23 @@ def throttle_delays(key_pre_delay_ms=0, key_post_delay_ms=0):
             f'Post-key: {_THROTTLES["key_post_delay_ms"]}ms')
 
 
+_WINDOW_CONTEXT = {
+    'cache_ttl_ms': 30,
+}
+
+
+def window_context_cache(ttl_ms=30):
+    """
+    Set how long (in ms) a window context result is reused for the following
+    key events, instead of asking the desktop again. 0 asks on every event.
+    """
+    ms_min, ms_max = 0, 500
+    if not (ms_min <= ttl_ms <= ms_max):
+        error(f'Window context cache TTL out of range. Clamping to valid range: {ms_min} to {ms_max}.')
+    _WINDOW_CONTEXT['cache_ttl_ms'] = clamp(ttl_ms, ms_min, ms_max)
+    debug(f"Window context cache TTL = {_WINDOW_CONTEXT['cache_ttl_ms']}ms")
+
+
 _REPEATING_KEYS = {
     'ignore_repeating_keys': True,
 }
@@ -406,17 +423,29 @@ def unicode_keystrokes(n):
     return _unicode_keystrokes
 
 
+# (aliases, compiled regex) matching one leading "Alias-" in a combo string,
+# only rebuilt when add_modifier() has brought in new aliases
+_MODIFIER_PREFIX = ((), None)
+
+
+def _modifier_prefix_re():
+    global _MODIFIER_PREFIX
+    aliases = Modifier.all_aliases()
+    if aliases is not _MODIFIER_PREFIX[0]:
+        _MODIFIER_PREFIX = (aliases, re.compile(f"\\A({'|'.join(aliases)})-"))
+    return _MODIFIER_PREFIX[1]
+
+
 def combo(exp):  # pylint: disable=invalid-name
     "Helper function to specify keymap"
     modifier_strs = []
+    prefix_re = _modifier_prefix_re()
     while True:
-        aliases = "|".join(Modifier.all_aliases())
-        m = re.match(f"\\A({aliases})-", exp)
+        m = prefix_re.match(exp)
         if m is None:
             break
-        modifier = m.group(1)
-        modifier_strs.append(modifier)
-        exp = re.sub(rf"\A{modifier}-", "", exp)
+        modifier_strs.append(m.group(1))
+        exp = exp[m.end():]
     key_str = exp.upper()
     key = Key[key_str]
     return Combo(_create_modifiers_from_strings(modifier_strs), key)
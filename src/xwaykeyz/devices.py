@@ -70,6 +70,9 @@ class DeviceRegistry:
     def cares_about(self, device):
         return self._filter.filter(device)
 
+    def cares_about_path(self, filename):
+        return self._filter.filter_path(filename)
+
     def autodetect(self):
         devices = list(filter(self._filter.filter, Devices.all()))
 
@@ -151,6 +154,16 @@ class DeviceFilter:
 
         return False
 
+    def filter_path(self, filename):
+        # Cheap check by device path alone, usable before the device node
+        # can be opened. Name matches can't be ruled out without opening it.
+        if not self.matches:
+            return True
+        for match in self.matches:
+            if match == filename or not match.startswith("/dev/"):
+                return True
+        return False
+
     def filter(self, device: InputDevice):
         # Match by device path or name, if no keyboard devices specified,
         # picks up keyboard-ish devices.
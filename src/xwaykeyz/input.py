@@ -1,10 +1,12 @@
 import asyncio
+import os
 import signal
+import traceback
 from asyncio import Task, TimerHandle
+from collections import OrderedDict
+from errno import ENODEV, ENOENT
 from inotify_simple import INotify, flags
-from inotify_simple import Event as inotify_Event
-from sys import exit
-from typing import List, Optional
+from typing import Dict, Optional, Set
 
 from evdev import InputDevice, InputEvent, ecodes
 from evdev.eventio import EventIO
@@ -19,26 +21,33 @@ from .transform import boot_config, dump_diagnostics, on_event
 CONFIG = config_api
 
 
+_shutdown_event: Optional[asyncio.Event] = None
+
+
 def shutdown():
-    loop = asyncio.get_event_loop()
-    loop.stop()
     transform.shutdown()
 
 
+def request_shutdown():
+    # never stop or exit from inside a loop callback, just wake up
+    # `_main` and let it unwind and clean up on its own
+    _shutdown_event.set()
+
+
 def sig_term():
     print("signal TERM received", flush=True)
-    shutdown()
-    exit(0)
+    request_shutdown()
 
 
 def sig_int():
     print("signal INT received", flush=True)
-    shutdown()
-    exit(0)
+    request_shutdown()
 
 
 def watch_dev_input():
     inotify = INotify()
+    # the reader drains until empty, make sure that can never block
+    os.set_blocking(inotify.fd, False)
     inotify.add_watch("/dev/input", flags.CREATE | flags.ATTRIB | flags.DELETE)
     return inotify
 
@@ -46,24 +55,35 @@ def watch_dev_input():
 # Why? xmodmap won't persist mapping changes until it's seen at least
 # one keystroke on a new device, so we need to give it something that
 # won't do any harm, but is still an actual keypress, hence shift.
+_WAKEUP_EVENTS = (
+    InputEvent(0, 0, ecodes.EV_KEY, Key.LEFT_SHIFT, Action.PRESS),
+    InputEvent(0, 0, ecodes.EV_KEY, Key.LEFT_SHIFT, Action.RELEASE),
+)
+
+
 def wakeup_output():
-    down = InputEvent(0, 0, ecodes.EV_KEY, Key.LEFT_SHIFT, Action.PRESS)
-    up = InputEvent(0, 0, ecodes.EV_KEY, Key.LEFT_SHIFT, Action.RELEASE)
-    for ev in [down, up]:
+    for ev in _WAKEUP_EVENTS:
         on_event(ev, None)
 
 
 def main_loop(arg_devices, device_watch):
-    inotify = None
-
     boot_config()
     wakeup_output()
 
+    asyncio.run(_main(arg_devices, device_watch))
+
+
+async def _main(arg_devices, device_watch):
+    global _shutdown_event
+    inotify = None
+    registry = None
+    _shutdown_event = asyncio.Event()
+
     if device_watch:
         inotify = watch_dev_input()
 
+    loop = asyncio.get_running_loop()
     try:
-        loop = asyncio.get_event_loop()
         registry = DeviceRegistry(
             loop, input_cb=receive_input, filterer=DeviceFilter(arg_devices)
         )
@@ -72,99 +92,155 @@ def main_loop(arg_devices, device_watch):
         if device_watch:
             loop.add_reader(inotify.fd, _inotify_handler, registry, inotify)
 
-        _sup = loop.create_task(supervisor())  # noqa: F841
         loop.add_signal_handler(signal.SIGINT, sig_int)
         loop.add_signal_handler(signal.SIGTERM, sig_term)
         info("Ready to process input.")
-        loop.run_forever()
+        await _shutdown_event.wait()
     except DeviceGrabError:
-        loop.stop()
+        pass
     finally:
         shutdown()
-        registry.ungrab_all()
+        if registry is not None:
+            registry.ungrab_all()
         if device_watch:
+            loop.remove_reader(inotify.fd)
             inotify.close()
 
 
-_tasks: List[Task] = []
-_sup = None
-
+# hold strong references to running tasks until they finish
+_tasks: Set[Task] = set()
 
-async def supervisor():
-    while True:
-        await asyncio.sleep(5)
-        for task in _tasks:
-            if task.done():
-                if task.exception():
-                    import traceback
 
-                    traceback.print_exception(task.exception())
-                _tasks.remove(task)
+def _task_done(task: Task):
+    _tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc:
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
 
 
 def receive_input(device: EventIO):
+    # hot path, hoist global/attribute lookups out of the event loop
+    EV_KEY = ecodes.EV_KEY
+    eject_key = CONFIG.EMERGENCY_EJECT_KEY
+    diag_key = CONFIG.DUMP_DIAGNOSTICS_KEY
+    _on_event = on_event
     try:
         for event in device.read():
-            if event.type == ecodes.EV_KEY:
-                if event.code == CONFIG.EMERGENCY_EJECT_KEY:
+            if event.type == EV_KEY:
+                if event.code == eject_key:
                     error("BAIL OUT: Emergency eject - shutting down.")
-                    shutdown()
-                    exit(0)
-                if event.code == CONFIG.DUMP_DIAGNOSTICS_KEY:
-                    action = Action(event.value)
-                    if action.just_pressed():
+                    # stop reading, the main loop cleans up from here
+                    request_shutdown()
+                    return
+                if event.code == diag_key:
+                    if event.value == Action.PRESS:
                         debug("DIAG: Diagnostics requested.")
                         dump_diagnostics()
                     continue
 
-            on_event(event, device)
+            _on_event(event, device)
     # swallow "no such device errors" when unplugging a USB
     # device and we still have a few events in the inotify queue
     except OSError as e:
-        if not e.errno == 19: # no such device
+        if e.errno not in (ENODEV, ENOENT):
             raise
+        # a hung up fd stays readable, stop listening until the DELETE
+        # for its node gets around to ungrabbing it properly
+        asyncio.get_running_loop().remove_reader(device)
 
 
 _add_timer: Optional[TimerHandle] = None
-_notify_events = []
+# pending inotify masks keyed by device node name, OR'd together so that
+# a burst of CREATE/ATTRIB/DELETE on the same node collapses into one
+# decision without losing a DELETE that came before a CREATE (replug)
+_notify_events: "OrderedDict[str, int]" = OrderedDict()
+# device_change retries waiting on udev to fix up a node, keyed by node name
+_attrib_waiters: "Dict[str, asyncio.Future]" = {}
 
 
 def _inotify_handler(registry, inotify: INotify):
     global _add_timer
-    global _notify_events
 
-    events = inotify.read(0)
-    _notify_events.extend(events)
+    # drain everything the kernel has queued, not just one buffer's worth,
+    # so a burst of new device nodes doesn't wait for another wakeup
+    while True:
+        events = inotify.read(0)
+        if not events:
+            break
+        for event in events:
+            # type hint for `event_name` helps linter highlight `startswith()` correctly
+            event_name: str = event.name
+            # ignore mouse, mice, etc, non-event devices
+            if not event_name.startswith("event"):
+                continue
+            if event.mask & flags.ATTRIB and event_name in _attrib_waiters:
+                _attrib_waiters.pop(event_name).set_result(None)
+            _notify_events[event_name] = _notify_events.get(event_name, 0) | event.mask
+            _notify_events.move_to_end(event_name)
+
+    if not _notify_events:
+        return
 
     if _add_timer:
         _add_timer.cancel()
 
     def device_change_task():
         task = loop.create_task(device_change(registry, _notify_events))
-        _tasks.append(task)
+        _tasks.add(task)
+        task.add_done_callback(_task_done)
 
     loop = asyncio.get_running_loop()
     # slow the roll a bit to allow for udev to change permissions, etc...
     _add_timer = loop.call_later(0.5, device_change_task)
 
 
-async def device_change(registry: DeviceRegistry, events: List[inotify_Event]):
+async def _wait_for_attrib(filename, timeout):
+    """
+    Wait until the attributes of a device node change (udev applying
+    permissions/ACLs) or the timeout expires, whichever comes first
+    """
+    # watching the node itself would need the very read permission we are
+    # waiting for, the /dev/input watcher reports ATTRIB for it instead
+    name = os.path.basename(filename)
+    changed = _attrib_waiters.get(name)
+    if changed is None:
+        changed = asyncio.get_running_loop().create_future()
+        _attrib_waiters[name] = changed
+    try:
+        # shielded, another retry loop may be waiting on the same node
+        await asyncio.wait_for(asyncio.shield(changed), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        if _attrib_waiters.get(name) is changed:
+            del _attrib_waiters[name]
+
+
+async def device_change(registry: DeviceRegistry,
+                        events: "OrderedDict[str, int]"):
     while events:
-        event: inotify_Event = events.pop(0)
+        event_name, mask = events.popitem(last=False)
+        filename = f"/dev/input/{event_name}"
+
+        # unplugging, whatever sits on this node now (if anything) is a
+        # different device than the one we grabbed, so always let go first
+        if mask & flags.DELETE:
+            registry.ungrab_by_filename(filename)
 
-        # type hint for `event.name` helps linter highlight `startswith()` correctly
-        event_name: str = event.name
-        # ignore mouse, mice, etc, non-event devices
-        if not event_name.startswith("event"):
+        if not mask & (flags.CREATE | flags.ATTRIB):
             continue
 
-        filename = f"/dev/input/{event.name}"
+        # don't bother retrying devices we would ignore anyway
+        if not registry.cares_about_path(filename):
+            continue
 
         # deal with a permission problem of unknown origin
         tries                   = 9
         loop_cnt                = 1
         delay                   = 0.2
-        delay_max               = delay * (2 ** (tries - 1))
+        delay_max               = 2.0
 
         device = None
         while loop_cnt <= tries:
@@ -182,19 +258,13 @@ async def device_change(registry: DeviceRegistry, events: List[inotify_Event]):
                 else:
                     error(  f"Retrying to initialize '{filename}' due to PermissionError. "
                             f"Attempt {loop_cnt} of {tries}.\n\t{perm_err}")
-            await asyncio.sleep(delay)
+            await _wait_for_attrib(filename, delay)
             delay = min(delay * 2, delay_max)
             loop_cnt += 1
 
         if device is None:
             continue
 
-        # unplugging
-        if event.mask == flags.DELETE:
-            if device in registry:
-                registry.ungrab(device)
-            continue
-
         # potential new device
         try:
             if device not in registry:
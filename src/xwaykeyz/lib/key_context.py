@@ -4,31 +4,28 @@ from .window_context import WindowContextProvider
 
 
 class KeyContext:
+    # created for every key event, so keep instances small
+    __slots__ = ("_X_ctx", "_device", "_leds")
+
     def __init__(self, device: InputDevice, window_context: WindowContextProvider):
-        self._X_ctx = None
         self._device = device
-        self._win_ctx_provider = window_context
-
-    def _query_window_context(self):
-        # cache this,  think it might be expensive
-        if self._X_ctx is None:
-            self._X_ctx = self._win_ctx_provider.get_window_context()
+        self._leds = None
+        # every key event checks `x_error` right away, so there is nothing
+        # to gain by deferring the query until first property access
+        self._X_ctx = window_context.get_window_context()
 
     @property
     def wm_class(self):
-        self._query_window_context()
         # guarantee string type returned
         return self._X_ctx["wm_class"] or "ERR: KeyContext: NoneType in wm_class"
 
     @property
     def wm_name(self):
-        self._query_window_context()
         # guarantee string type returned
         return self._X_ctx["wm_name"] or "ERR: KeyContext: NoneType in wm_name"
 
     @property
     def x_error(self):
-        self._query_window_context()
         return self._X_ctx["x_error"]
 
     @property
@@ -36,10 +33,17 @@ class KeyContext:
         # guarantee string type returned
         return self._device.name or "ERR: KeyContext: NoneType in device_name"
 
+    def _query_leds(self):
+        # leds() is an ioctl on real devices, only ask once per event
+        if self._leds is None:
+            self._leds = self._device.leds()
+
     @property
     def capslock_on(self):
-        return Key.LED_CAPSL in self._device.leds()
+        self._query_leds()
+        return Key.LED_CAPSL in self._leds
 
     @property
     def numlock_on(self):
-        return Key.LED_NUML in self._device.leds()
+        self._query_leds()
+        return Key.LED_NUML in self._leds
@@ -1,21 +1,21 @@
 import os
 import abc
-try:
-    import dbus
-except ModuleNotFoundError:
-    dbus = None
 import json
 import time
-import i3ipc
-import shutil
+try:
+    # much quicker than json, but optional
+    import orjson as fast_json
+except ModuleNotFoundError:
+    fast_json = json
 import socket
-import subprocess
+import functools
+import selectors
+import threading
 
 from random import randint
-from subprocess import PIPE
-from i3ipc import Con
 from typing import Dict, Optional
 
+from . import logger
 from .logger import error, debug
 
 # Provider classes for window context info
@@ -29,9 +29,147 @@ from .logger import error, debug
 NO_CONTEXT_WAS_ERROR = {"wm_class": "", "wm_name": "", "x_error": True}
 
 
+def ttl_cache(get_window_context):
+    """
+    Decorator for provider `get_window_context()` methods. Reuses the last
+    good context for `context_ttl` seconds, so a burst of keystrokes (key
+    repeat, macros) costs one D-Bus/IPC round-trip instead of one per event.
+    Error results are never reused, so the refresh paths still run.
+    """
+    @functools.wraps(get_window_context)
+    def wrapper(self):
+        now = time.monotonic()
+        if self._last_ctx is not None and now - self._last_ts < self.context_ttl * self._throttle_mult:
+            return self._last_ctx
+        ctx = get_window_context(self)
+        if ctx["x_error"]:
+            self._last_ctx = None
+        else:
+            self._last_ctx = ctx
+            self._last_ts = now
+        return ctx
+    return wrapper
+
+
+_dbus_glib_mainloop = None
+
+
+def get_dbus_glib_mainloop():
+    """
+    Run a GLib main loop on a background thread so D-Bus signals get
+    dispatched, and return the dbus-python main loop object that
+    `get_session_bus()` attaches to. Returns None if PyGObject isn't
+    installed, in which case providers just keep polling.
+    """
+    global _dbus_glib_mainloop
+    if _dbus_glib_mainloop is None:
+        try:
+            from gi.repository import GLib
+            from dbus.mainloop.glib import DBusGMainLoop, threads_init
+        except ImportError:
+            return None
+        threads_init()
+        _dbus_glib_mainloop = DBusGMainLoop()
+        threading.Thread(target=GLib.MainLoop().run, name='dbus-signals', daemon=True).start()
+    return _dbus_glib_mainloop
+
+
+_session_bus = None
+
+
+def get_session_bus():
+    """
+    The one D-Bus session bus connection shared by every provider. It is
+    attached to the signal main loop, if one was started before this was
+    first called.
+    """
+    global _session_bus
+    if _session_bus is None:
+        import dbus
+        _session_bus = dbus.SessionBus(private=False, mainloop=_dbus_glib_mainloop)
+    return _session_bus
+
+
+def watch_active_window_signal(provider, dbus_obj, dbus_path):
+    """
+    Let a Toshy D-Bus service push focus changes through an
+    'ActiveWindowChanged' signal, instead of being asked on every keystroke.
+    `provider._signal_ctx` stays None (and the provider keeps calling
+    GetActiveWindow) until the service actually emits the signal, and is
+    reset whenever the service restarts or goes away.
+    """
+    def on_owner_change(new_owner):
+        provider._signal_ctx = None
+
+    provider.session_bus.add_signal_receiver(
+        provider._on_active_window_changed,
+        signal_name='ActiveWindowChanged',
+        dbus_interface=dbus_obj,
+        bus_name=dbus_obj,
+        path=dbus_path,
+    )
+    provider.session_bus.watch_name_owner(dbus_obj, on_owner_change)
+
+
+def watch_screensaver_signal(provider):
+    """
+    Stretch the provider's context cache 5x while the screen is locked,
+    nothing can usefully change focus then. Unlocking drops the cached
+    context so the first keystroke afterwards asks again.
+    """
+    def on_active_changed(active):
+        if active:
+            provider._throttle_mult = 5
+        else:
+            provider._throttle_mult = 1
+            provider._last_ctx = None
+
+    provider.session_bus.add_signal_receiver(
+        on_active_changed,
+        signal_name='ActiveChanged',
+        dbus_interface='org.freedesktop.ScreenSaver',
+    )
+
+
+def backoff_delays(first=0.1, cap=3.0):
+    """
+    Endless sleep times for retry loops, doubling from `first` up to `cap`
+    seconds. A service that is only a moment late gets picked up quickly.
+    """
+    delay = first
+    while True:
+        yield delay
+        delay = min(delay * 2, cap)
+
+
+# (session type, desktop environment) -> provider class, see `register_provider`
+_PROVIDERS: Dict[tuple, type] = {}
+
+
+def register_provider(cls):
+    """
+    Class decorator that makes a provider class available for every
+    environment its `get_supported_environments()` returns.
+    """
+    for env in cls.get_supported_environments():
+        _PROVIDERS[env] = cls
+    return cls
+
+
 class WindowContextProviderInterface(abc.ABC):
     """Abstract base class for all window context provider classes"""
 
+    # seconds a good context is reused by `ttl_cache`, 0 disables the cache
+    context_ttl: float          = 0.03
+    # used by `ttl_cache`, instances shadow these once they have a context
+    _last_ctx: Optional[dict]   = None
+    _last_ts: float             = 0.0
+    # stretches the cache TTL while the screen is locked
+    _throttle_mult: int         = 1
+    # D-Bus providers: longest wait for a method reply, in seconds (the library
+    # default is 25 s, which would stall input on a frozen shell/extension)
+    dbus_timeout: float         = 0.25
+
     @classmethod
     @abc.abstractmethod
     def get_supported_environments(cls):
@@ -94,6 +232,7 @@ class WindowContextProviderInterface(abc.ABC):
 
 
 # An example class to copy and paste to start supporting a new environment
+@register_provider
 class Example_WindowContext(WindowContextProviderInterface):
     """Window context provider object for [Example] environments"""
 
@@ -111,6 +250,7 @@ class Example_WindowContext(WindowContextProviderInterface):
         pass
 
 
+@register_provider
 class Wl_Pantheon_WindowContext(WindowContextProviderInterface):
     """
     Window context provider object for Wayland+Pantheon environments.
@@ -118,11 +258,19 @@ class Wl_Pantheon_WindowContext(WindowContextProviderInterface):
     information about the currently focused window.
     """
 
+    NO_FOCUSED_WINDOW = {
+        "wm_class": 'ERR_No_Focused_Window', 
+        "wm_name": 'ERR_No_Focused_Window', 
+        "x_error": False
+    }
+
     def __init__(self):
+        import dbus
         from dbus.exceptions import DBusException
 
         self.DBusException      = DBusException
-        self.session_bus        = dbus.SessionBus()
+        self.dbus               = dbus
+        self.session_bus        = get_session_bus()
 
         self.wm_class           = 'NO_DATA_YET'
         self.app_id             = 'NO_DATA_YET'
@@ -132,18 +280,29 @@ class Wl_Pantheon_WindowContext(WindowContextProviderInterface):
         self.gala_dbus_path     = '/org/pantheon/gala/DesktopInterface'
         self.dbus_svc_name      = 'Pantheon Gala D-Bus service'
 
+        retry_delays = backoff_delays()
         while True:
             try:
                 self.proxy_gala_svc = self.session_bus.get_object(
                     self.gala_dbus_obj, self.gala_dbus_path
                 )
-                self.iface_gala_svc = dbus.Interface(
+                self.iface_gala_svc = self.dbus.Interface(
                     self.proxy_gala_svc, 'org.pantheon.gala.DesktopIntegration'
                 )
                 break
             except self.DBusException as dbus_error:
                 error(f'Error getting {self.dbus_svc_name} interface.\n\t{dbus_error}')
-            time.sleep(3)
+            time.sleep(next(retry_delays))
+
+    def get_focused_window_props(self):
+        """
+        Return the properties of the focused window, or None if no window has focus.
+        Gala only exports GetWindows(), so search that for the one with 'has-focus'.
+        """
+        for window_id, properties in self.iface_gala_svc.GetWindows(timeout=self.dbus_timeout):
+            if properties.get('has-focus', False):
+                return properties
+        return None
 
     @classmethod
     def get_supported_environments(cls):
@@ -155,37 +314,33 @@ class Wl_Pantheon_WindowContext(WindowContextProviderInterface):
             ('wayland', 'pantheon'),
         ]
 
+    @ttl_cache
     def get_window_context(self):
         """
         Return window context to KeyContext
         Queries the Gala D-Bus service for the current window's app class and title.
         """
         try:
-            # Use GetWindows method to find the focused window
-            windows = self.iface_gala_svc.GetWindows()
-            for window in windows:
-                window_id, properties = window
-                if properties.get('has-focus', False):
-                    # This block only executes if the get() succeeded and did not return "False"
-                    self.wm_class = properties.get('wm-class', '')
-                    self.app_id = properties.get('app-id', '').rstrip('.desktop')
-                    self.title = properties.get('title', '')
-                    # debug(f"####  Pantheon wm-class:    '{self.wm_class}'")
-                    # debug(f"####  Pantheon app-id:      '{self.app_id}'")
-                    # debug(f"####  Pantheon title:       '{self.title}'")
-                    break
+            properties = self.get_focused_window_props()
+            if properties:
+                self.wm_class = properties.get('wm-class', '')
+                self.app_id = properties.get('app-id', '')
+                # rstrip('.desktop') would also eat trailing 'd', 'e', 's', ... chars,
+                # and str.removesuffix() needs Python 3.9
+                if self.app_id.endswith('.desktop'):
+                    self.app_id = self.app_id[:-len('.desktop')]
+                self.title = properties.get('title', '')
+                # debug(f"####  Pantheon wm-class:    '{self.wm_class}'")
+                # debug(f"####  Pantheon app-id:      '{self.app_id}'")
+                # debug(f"####  Pantheon title:       '{self.title}'")
             else:
                 # return NO_CONTEXT_WAS_ERROR       # Prevents keymapping on bare desktop/workspace.
 
                 # Pantheon Wayland session appears to suffer from a defect that affects some other
                 # desktop environments. When no window is open on a workspace, the desktop itself
-                # will not be considered a focused window, so nothing will be returned from the `for`
-                # loop, which means some dummy info must be returned instead of NO_CONTEXT_WAS_ERROR. 
-                return {
-                    "wm_class": 'ERR_No_Focused_Window', 
-                    "wm_name": 'ERR_No_Focused_Window', 
-                    "x_error": False
-                }
+                # will not be considered a focused window, so no window properties will be found,
+                # which means some dummy info must be returned instead of NO_CONTEXT_WAS_ERROR. 
+                return self.NO_FOCUSED_WINDOW
 
         except self.DBusException as dbus_error:
             error(f'{self.dbus_svc_name} interface stale?:\n\t{dbus_error}')
@@ -194,122 +349,182 @@ class Wl_Pantheon_WindowContext(WindowContextProviderInterface):
                 self.proxy_gala_svc = self.session_bus.get_object(
                     self.gala_dbus_obj, self.gala_dbus_path
                 )
-                self.iface_gala_svc = dbus.Interface(
+                self.iface_gala_svc = self.dbus.Interface(
                     self.proxy_gala_svc, 'org.pantheon.gala.DesktopIntegration'
                 )
             except self.DBusException as dbus_error:
                 error(f'Error refreshing {self.dbus_svc_name} interface.\n\t{dbus_error}')
                 return NO_CONTEXT_WAS_ERROR
 
-        debug(f"PANTHEON_CTX: Using D-Bus interface '{self.gala_dbus_obj}' for window context", ctx='CX')
+        if logger.VERBOSE:
+            debug(f"PANTHEON_CTX: Using D-Bus interface '{self.gala_dbus_obj}' for window context", ctx='CX')
 
         return {"wm_class": self.wm_class or self.app_id, "wm_name": self.title, "x_error": False}
 
 
-class Wl_COSMIC_WindowContext(WindowContextProviderInterface):
+class Toshy_DBus_WindowContext(WindowContextProviderInterface):
     """
-    Window context provider object for Wayland+COSMIC environments.
-    Nearly identical to the Wlroots context provider class, but talks
-    to a different D-Bus service object/path interface address. 
+    Shared base for providers that get window context from one of the
+    Toshy D-Bus services (COSMIC, Wlroots, KDE Plasma). Subclasses set the
+    service address, and which keys of the GetActiveWindow() dictionary
+    hold the window class and name.
     """
 
+    toshy_dbus_obj: str         = None
+    toshy_dbus_path: str        = None
+    dbus_svc_name: str          = None
+    debug_tag: str              = None
+    key_wm_class: str           = 'app_id'
+    key_wm_name: str            = 'title'
+
+    # the proxy is bound to the unique name of the service instance it was made
+    # for, so only these mean a restarted/replaced service and a stale proxy
+    STALE_PROXY_ERRORS = (
+        'org.freedesktop.DBus.Error.ServiceUnknown',
+        'org.freedesktop.DBus.Error.NameHasNoOwner',
+    )
+
     def __init__(self):
+        import dbus
         from dbus.exceptions import DBusException
 
         self.DBusException      = DBusException
-        self.session_bus        = dbus.SessionBus()
-
-        self.app_id             = None
-        self.title              = None
+        self.dbus               = dbus
+        self.dbus_mainloop      = get_dbus_glib_mainloop()
+        self.session_bus        = get_session_bus()
+        self._signal_ctx        = None
 
-        self.toshy_dbus_obj     = 'org.toshy.Cosmic'
-        self.toshy_dbus_path    = '/org/toshy/Cosmic'
-        self.dbus_svc_name      = 'Toshy COSMIC D-Bus service'
+        self.wm_class           = None
+        self.wm_name            = None
 
+        retry_delays = backoff_delays()
         while True:
             try:
-                self.proxy_toshy_svc = self.session_bus.get_object( self.toshy_dbus_obj,
-                                                                    self.toshy_dbus_path)
-                self.iface_toshy_svc = dbus.Interface(  self.proxy_toshy_svc,
-                                                        self.toshy_dbus_obj)
+                self._get_interface()
                 break
             except self.DBusException as dbus_error:
                 error(f'Error getting {self.dbus_svc_name} interface.\n\t{dbus_error}')
-            time.sleep(3)
+            time.sleep(next(retry_delays))
+
+        if self.dbus_mainloop:
+            watch_active_window_signal(self, self.toshy_dbus_obj, self.toshy_dbus_path)
+            watch_screensaver_signal(self)
 
     @classmethod
     def get_supported_environments(cls):
-        """
-        This class supports the COSMIC environment on Wayland, by talking
-        to the Toshy COSMIC D-Bus service at 'org.toshy.Cosmic'. 
-        """
-        return [
-            ('wayland', 'cosmic'),
-        ]
+        # Only the service specific subclasses support any environments
+        return []
 
+    def _get_interface(self):
+        self.proxy_toshy_svc    = self.session_bus.get_object(  self.toshy_dbus_obj,
+                                                                self.toshy_dbus_path)
+        self.iface_toshy_svc    = self.dbus.Interface(  self.proxy_toshy_svc,
+                                                        self.toshy_dbus_obj)
+        # dbus.Interface builds a new method object on every attribute access
+        self.get_active_window  = self.iface_toshy_svc.GetActiveWindow
+
+    def _read_window_info(self, window_info_dct):
+        # dbus.String keys compare equal to str, only convert the values we use
+        self.wm_class           = str(window_info_dct.get(self.key_wm_class, ''))
+        self.wm_name            = str(window_info_dct.get(self.key_wm_name, ''))
+
+    def _on_active_window_changed(self, window_info_dct):
+        """Keep the latest window info pushed by the service"""
+        self._signal_ctx = {
+            "wm_class": str(window_info_dct.get(self.key_wm_class, '')),
+            "wm_name": str(window_info_dct.get(self.key_wm_name, '')),
+            "x_error": False
+        }
+
+    def _on_retry_reply(self, window_info_dct):
+        self._read_window_info(window_info_dct)
+        debug(f'{self.dbus_svc_name} interface restored!')
+
+    def _on_retry_error(self, dbus_error):
+        debug(f'Error returned from {self.dbus_svc_name}:\n\t{dbus_error}')
+        # stop answering with the old window, next keystroke reports the error
+        self.wm_class           = None
+
+    @ttl_cache
     def get_window_context(self):
         """
         Return window context to KeyContext
-        Gets window context info from Toshy COSMIC D-Bus service, fed by Wayland events.
+        Gets window context info from the Toshy D-Bus service.
         """
+        # service pushes focus changes, nothing to ask for
+        if self._signal_ctx is not None:
+            return self._signal_ctx
+
         try:
-            # Convert to native Python dict type from 'dbus.Dictionary()' type
-            window_info_dct     = dict(self.iface_toshy_svc.GetActiveWindow())
+            # 'dbus.Dictionary()' is a dict subclass, no need to copy it
+            window_info_dct     = self.get_active_window(timeout=self.dbus_timeout)
         except self.DBusException as dbus_error:
             error(f'{self.dbus_svc_name} interface stale?:\n\t{dbus_error}')
-            error(f'Trying to refresh {self.dbus_svc_name} interface...')
-            try:
-                self.proxy_toshy_svc = self.session_bus.get_object( self.toshy_dbus_obj,
-                                                                    self.toshy_dbus_path)
-                self.iface_toshy_svc = dbus.Interface(  self.proxy_toshy_svc,
-                                                        self.toshy_dbus_obj)
-            except self.DBusException as dbus_error:
-                error(f'Error refreshing {self.dbus_svc_name} interface.\n\t{dbus_error}')
+            if dbus_error.get_dbus_name() in self.STALE_PROXY_ERRORS:
+                error(f'Trying to refresh {self.dbus_svc_name} interface...')
+                try:
+                    self._get_interface()
+                except self.DBusException as dbus_error:
+                    error(f'Error refreshing {self.dbus_svc_name} interface.\n\t{dbus_error}')
+            if self.dbus_mainloop and self.wm_class is not None:
+                # don't block the keystroke on another round-trip, answer with the
+                # last known window and let the reply catch up in the background
+                self.get_active_window(
+                    reply_handler=self._on_retry_reply, error_handler=self._on_retry_error,
+                    timeout=self.dbus_timeout)
+                return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
             try:
-                # Convert to native Python dict type from 'dbus.Dictionary()' type
-                window_info_dct     = dict(self.iface_toshy_svc.GetActiveWindow())
+                window_info_dct     = self.get_active_window(timeout=self.dbus_timeout)
                 debug(f'{self.dbus_svc_name} interface restored!')
             except self.DBusException as dbus_error: 
                 debug(f'Error returned from {self.dbus_svc_name}:\n\t{dbus_error}')
                 return NO_CONTEXT_WAS_ERROR
 
-        # native_dict = {str(key): str(value) for key, value in dbus_dict.items()}
-        new_wdw_info_dct    = {str(key): str(value) for key, value in window_info_dct.items()}
+        self._read_window_info(window_info_dct)
 
-        self.app_id         = new_wdw_info_dct.get('app_id', '')
-        self.title          = new_wdw_info_dct.get('title', '')
+        if logger.VERBOSE:
+            debug(f"{self.debug_tag}: Using D-Bus interface '{self.toshy_dbus_obj}' for window context", ctx='CX')
 
-        debug(f"COSMIC_DBUS_SVC: Using D-Bus interface '{self.toshy_dbus_obj}' for window context", ctx='CX')
+        return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
 
-        return {"wm_class": self.app_id, "wm_name": self.title, "x_error": False}
 
+@register_provider
+class Wl_COSMIC_WindowContext(Toshy_DBus_WindowContext):
+    """
+    Window context provider object for Wayland+COSMIC environments.
+    Nearly identical to the Wlroots context provider class, but talks
+    to a different D-Bus service object/path interface address. 
+    The Toshy COSMIC D-Bus service is fed by Wayland events.
+    """
 
-class Wl_Wlroots_WindowContext(WindowContextProviderInterface):
-    """Window context provider object for Wayland+Wlroots environments"""
+    toshy_dbus_obj              = 'org.toshy.Cosmic'
+    toshy_dbus_path             = '/org/toshy/Cosmic'
+    dbus_svc_name               = 'Toshy COSMIC D-Bus service'
+    debug_tag                   = 'COSMIC_DBUS_SVC'
 
-    def __init__(self):
-        from dbus.exceptions import DBusException
+    @classmethod
+    def get_supported_environments(cls):
+        """
+        This class supports the COSMIC environment on Wayland, by talking
+        to the Toshy COSMIC D-Bus service at 'org.toshy.Cosmic'. 
+        """
+        return [
+            ('wayland', 'cosmic'),
+        ]
 
-        self.DBusException      = DBusException
-        self.session_bus        = dbus.SessionBus()
 
-        self.app_id             = None
-        self.title              = None
+@register_provider
+class Wl_Wlroots_WindowContext(Toshy_DBus_WindowContext):
+    """
+    Window context provider object for Wayland+Wlroots environments.
+    The Toshy Wlroots D-Bus service is fed by Wlroots Wayland events, 
+    from 'wlr_foreign_toplevel_management_unstable_v1' protocol.
+    """
 
-        self.toshy_dbus_obj     = 'org.toshy.Wlroots'
-        self.toshy_dbus_path    = '/org/toshy/Wlroots'
-        self.dbus_svc_name      = 'Toshy Wlroots D-Bus service'
-
-        while True:
-            try:
-                self.proxy_toshy_svc = self.session_bus.get_object( self.toshy_dbus_obj,
-                                                                    self.toshy_dbus_path)
-                self.iface_toshy_svc = dbus.Interface(  self.proxy_toshy_svc,
-                                                        self.toshy_dbus_obj)
-                break
-            except self.DBusException as dbus_error:
-                error(f'Error getting {self.dbus_svc_name} interface.\n\t{dbus_error}')
-            time.sleep(3)
+    toshy_dbus_obj              = 'org.toshy.Wlroots'
+    toshy_dbus_path             = '/org/toshy/Wlroots'
+    dbus_svc_name               = 'Toshy Wlroots D-Bus service'
+    debug_tag                   = 'WLR_DBUS_SVC'
 
     @classmethod
     def get_supported_environments(cls):
@@ -333,48 +548,14 @@ class Wl_Wlroots_WindowContext(WindowContextProviderInterface):
 
         ]
 
-    def get_window_context(self):
-        """
-        Return window context to KeyContext
-        Gets window context info from D-Bus service fed by Wlroots Wayland events, 
-        from 'wlr_foreign_toplevel_management_unstable_v1' protocol.
-        """
-        try:
-            # Convert to native Python dict type from 'dbus.Dictionary()' type
-            window_info_dct     = dict(self.iface_toshy_svc.GetActiveWindow())
-        except self.DBusException as dbus_error:
-            error(f'{self.dbus_svc_name} interface stale?:\n\t{dbus_error}')
-            error(f'Trying to refresh {self.dbus_svc_name} interface...')
-            try:
-                self.proxy_toshy_svc = self.session_bus.get_object( self.toshy_dbus_obj,
-                                                                    self.toshy_dbus_path)
-                self.iface_toshy_svc = dbus.Interface(  self.proxy_toshy_svc,
-                                                        self.toshy_dbus_obj)
-            except self.DBusException as dbus_error:
-                error(f'Error refreshing {self.dbus_svc_name} interface.\n\t{dbus_error}')
-            try:
-                # Convert to native Python dict type from 'dbus.Dictionary()' type
-                window_info_dct     = dict(self.iface_toshy_svc.GetActiveWindow())
-                debug(f'{self.dbus_svc_name} interface restored!')
-            except self.DBusException as dbus_error: 
-                debug(f'Error returned from {self.dbus_svc_name}:\n\t{dbus_error}')
-                return NO_CONTEXT_WAS_ERROR
-
-        # native_dict = {str(key): str(value) for key, value in dbus_dict.items()}
-        new_wdw_info_dct    = {str(key): str(value) for key, value in window_info_dct.items()}
-
-        self.app_id         = new_wdw_info_dct.get('app_id', '')
-        self.title          = new_wdw_info_dct.get('title', '')
-
-        debug(f"WLR_DBUS_SVC: Using D-Bus interface '{self.toshy_dbus_obj}' for window context", ctx='CX')
-
-        return {"wm_class": self.app_id, "wm_name": self.title, "x_error": False}
-
 
+@register_provider
 class Wl_sway_WindowContext(WindowContextProviderInterface):
     """Window context provider object for Wayland+sway environments"""
 
     def __init__(self):
+        import i3ipc
+        self.i3ipc              = i3ipc
 
         # Create the connection object
         self.cnxn_obj           = None
@@ -383,6 +564,10 @@ class Wl_sway_WindowContext(WindowContextProviderInterface):
         self.wm_class           = None
         self.wm_name            = None
 
+        # kept up to date by sway focus events, None means ask with get_tree()
+        self._focused_ctx       = None
+        self._start_focus_events()
+
     @classmethod
     def get_supported_environments(cls):
         # This class supports the sway window manager environment on Wayland
@@ -393,15 +578,55 @@ class Wl_sway_WindowContext(WindowContextProviderInterface):
 
     def _establish_connection(self):
         """Establish a connection to sway IPC via i3ipc. Retry indefinitely if unsuccessful."""
+        retry_delays = backoff_delays()
         while True:
             try:
-                self.cnxn_obj = i3ipc.Connection(auto_reconnect=True)
+                self.cnxn_obj = self.i3ipc.Connection(auto_reconnect=True)
                 debug(f'CTX_SWAY: Connection object created.')
                 break
             # i3ipc.Connection() class may return generic Exception, or ConnectionError
             except (ConnectionError, Exception) as cnxn_err:
                 error(f'ERROR: Problem connecting to sway IPC via i3ipc:\n\t{cnxn_err}')
-                time.sleep(3)
+                time.sleep(next(retry_delays))
+
+    def _start_focus_events(self):
+        """
+        Follow focus changes on a second i3ipc connection (a connection can't
+        be shared with a thread blocked in main()), so most keystrokes never
+        need to fetch and rebuild the whole sway tree.
+        """
+        try:
+            self.event_cnxn = self.i3ipc.Connection(auto_reconnect=True)
+        except (ConnectionError, Exception) as cnxn_err:
+            error(f'ERROR: Problem connecting to sway IPC for focus events:\n\t{cnxn_err}')
+            return
+        self.event_cnxn.on('window::focus', self._on_window_focus)
+        self.event_cnxn.on('window::title', self._on_window_title)
+        # focus may land on an empty workspace, which sends no window::focus
+        self.event_cnxn.on('window::close', self._on_focus_unknown)
+        self.event_cnxn.on('workspace::focus', self._on_focus_unknown)
+        threading.Thread(target=self._watch_focus_events, name='sway-events', daemon=True).start()
+
+    def _watch_focus_events(self):
+        try:
+            self.event_cnxn.main()
+        finally:
+            self._focused_ctx = None
+
+    def _on_window_focus(self, cnxn, event):
+        con                     = event.container
+        self._focused_ctx = {
+            "wm_class": con.app_id or con.window_class or 'sway-ctx-error',
+            "wm_name": con.name or 'sway-ctx-error',
+            "x_error": False
+        }
+
+    def _on_window_title(self, cnxn, event):
+        if event.container.focused:
+            self._on_window_focus(cnxn, event)
+
+    def _on_focus_unknown(self, cnxn, event):
+        self._focused_ctx = None
 
     def get_active_wdw_ctx_sway_ipc(self):
         """Get sway window context via i3ipc Python module methods."""
@@ -423,21 +648,25 @@ class Wl_sway_WindowContext(WindowContextProviderInterface):
 
         return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
 
+    @ttl_cache
     def get_window_context(self):
         """Return window context to KeyContext"""
+        if self._focused_ctx is not None:
+            return self._focused_ctx
         return self.get_active_wdw_ctx_sway_ipc()
 
 
+@register_provider
 class Wl_Hyprland_WindowContext(WindowContextProviderInterface):
     """Window context provider object for Wayland+Hyprland environments"""
 
     def __init__(self):
-        from hyprpy import Hyprland
-        self.hypr_inst      = Hyprland()
+        # only built if the IPC socket path ever fails
+        self.hypr_inst      = None
 
-        self.first_run      = True
         self.sock           = None
-        self.hyprctl_cmd    = shutil.which('hyprctl')
+        self.sock_path      = None
+        self.selector       = selectors.DefaultSelector()
         self.wm_class       = None
         self.wm_name        = None
 
@@ -451,6 +680,9 @@ class Wl_Hyprland_WindowContext(WindowContextProviderInterface):
 
     def get_active_wdw_ctx_hyprpy(self):
         try:
+            if self.hypr_inst is None:
+                from hyprpy import Hyprland
+                self.hypr_inst  = Hyprland()
             window_info         = self.hypr_inst.get_active_window()
             debug(f"CTX_HYPR: Using 'hyprpy' for window context.", ctx='CX')
             self.wm_class       = window_info.wm_class
@@ -462,7 +694,7 @@ class Wl_Hyprland_WindowContext(WindowContextProviderInterface):
                 return  {"wm_class": "hyprpy_no_window", "wm_name": "hyprpy_no_window", "x_error": False}
             else:
                 error(f"ERROR: Problem getting active window context using 'hyprpy'.\n\t{e}")
-                return self.get_active_wdw_ctx_hypr_ipc()
+                return NO_CONTEXT_WAS_ERROR
 
     def _open_socket(self):
         """Utility function to open Hyprland IPC socket"""
@@ -472,32 +704,66 @@ class Wl_Hyprland_WindowContext(WindowContextProviderInterface):
             raise EnvironmentError('HYPRLAND_INSTANCE_SIGNATURE is not set. KeyError resulted.')
         if HIS is None:
             raise EnvironmentError('HYPRLAND_INSTANCE_SIGNATURE is not set.')
+        if self.sock_path is None:
+            # Hyprland 0.40+ keeps its sockets under XDG_RUNTIME_DIR, older under /tmp
+            runtime_dir = os.environ.get('XDG_RUNTIME_DIR', f'/run/user/{os.getuid()}')
+            self.sock_path = f"{runtime_dir}/hypr/{HIS}/.socket.sock"
+            if not os.path.exists(self.sock_path):
+                self.sock_path = f"/tmp/hypr/{HIS}/.socket.sock"
         self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self.sock.connect(f"/tmp/hypr/{HIS}/.socket.sock")
+        # never let a stuck compositor hang the input loop, a unix socket
+        # connects right away or fails (EAGAIN when the backlog is full)
+        self.sock.setblocking(False)
+        self.sock.connect(self.sock_path)
+        # the reply is waited for with the selector
+        self.selector.register(self.sock, selectors.EVENT_READ)
 
     def get_active_wdw_ctx_hypr_ipc(self):
-        """Get Hyprland window context using IPC socket (faster than shell commands)."""
+        """
+        Get Hyprland window context using IPC socket (faster than shell commands).
+        Returns None if the socket can't be opened at all.
+        """
         try:
-            if self.first_run or self.sock is None:
-                try:
-                    self._open_socket()
-                    debug(f'CTX_HYPR: Using IPC socket for window context.', ctx='CX')
-                except (socket.error, OSError, EnvironmentError) as conn_err:
-                    error(f'ERROR: Problem opening Hyprland IPC socket.\n\t{conn_err}')
-                    return self.get_active_wdw_ctx_hypr_shell() # Fallback to shell method
-                self.first_run = False
-
-            command = "-j activewindow"  # Replace with the actual command
+            # this runs on the input loop, so no retrying or sleeping here,
+            # a failed attempt is simply tried again on the next key
+            try:
+                self._open_socket()
+            except (socket.error, OSError, EnvironmentError) as conn_err:
+                if self.sock:
+                    self.sock.close()
+                    self.sock = None
+                error(f'ERROR: Problem opening Hyprland IPC socket.\n\t{conn_err}')
+                return None
+            if logger.VERBOSE:
+                debug('CTX_HYPR: Using IPC socket for window context.', ctx='CX')
+
+            command = "j/activewindow"  # flags go before the '/', 'j' asks for JSON
             self.sock.sendall(command.encode("utf-8"))
-            response: bytes     = self.sock.recv(1024)
-            wdw_info_str        = response.decode('utf-8')
+            # Hyprland answers one request per connection and then closes it, so
+            # read until EOF, a long window title won't fit in a single recv()
+            response            = bytearray()
+            deadline            = time.monotonic() + 0.02
+            while True:
+                timeout         = deadline - time.monotonic()
+                if timeout <= 0 or not self.selector.select(timeout):
+                    # compositor is slow, don't hold up the keystroke waiting
+                    if self.wm_class is None:
+                        debug('Hyprland IPC reply timed out, no window known yet.')
+                        return NO_CONTEXT_WAS_ERROR
+                    debug('Hyprland IPC reply timed out, using last known window.')
+                    return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
+                chunk: bytes    = self.sock.recv(65536)
+                if not chunk:
+                    break
+                response       += chunk
 
             # Check if the response is empty or not valid JSON
-            if not wdw_info_str.strip():
+            if not response.strip():
                 debug('No active window found or empty response from Hyprland IPC.')
                 return {"wm_class": "hypr_no_window", "wm_name": "hypr_no_window", "x_error": False}
 
-            window_info: dict   = json.loads(wdw_info_str) # Type hint for VSCode "get()" highlight
+            # both parsers take the raw UTF-8 bytes, no need to decode first
+            window_info: dict   = fast_json.loads(response) # Type hint for VSCode "get()" highlight
             self.wm_class       = window_info.get("class", "hypr-context-error")
             self.wm_name        = window_info.get("title", "hypr-context-error")
             return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
@@ -507,68 +773,42 @@ class Wl_Hyprland_WindowContext(WindowContextProviderInterface):
             return {"wm_class": "hyprIPC_no_window", "wm_name": "hyprIPC_no_window", "x_error": False}
         except (socket.error, OSError) as ctx_err:
             error(f'ERROR: Problem getting window context via Hyprland IPC socket:\n\t{ctx_err}')
-            # Close the socket
+            return NO_CONTEXT_WAS_ERROR
+        finally:
+            # the connection is spent either way, next run opens a new one
             if self.sock:
+                self.selector.unregister(self.sock)
                 self.sock.close()
-                self.sock = None  # Mark it as None so it will be re-opened on the next run
-            return NO_CONTEXT_WAS_ERROR
-
-    def get_active_wdw_ctx_hypr_shell(self):
-        """Get Hyprland window context using shell commands (will perform poorly)."""
-        if not self.hyprctl_cmd:
-            error(f'ERROR: Hyprland context fallback failed: "hyprctl" not found.')
-            return NO_CONTEXT_WAS_ERROR
-        try:
-            cmd_lst = [self.hyprctl_cmd, '-j', 'activewindow']
-            result = subprocess.run(cmd_lst, stdout=PIPE, stderr=PIPE, text=True, check=True)
-            wdw_info_str        = result.stdout
-            window_info: dict   = json.loads(wdw_info_str) # Type hint for VSCode "get()" highlight
-            self.wm_class       = window_info.get("class", "hypr-context-error")
-            self.wm_name        = window_info.get("title", "hypr-context-error")
-            debug(f'CTX_HYPR: Using shell command (hyprctl) for window context (FALLBACK!).', ctx='CX')
-            return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
-        except json.JSONDecodeError as json_err:
-            debug(f'No active window found or empty response from "hyprctl".\n\t{json_err}')
-            return {"wm_class": "hyprctl_no_window", "wm_name": "hyprctl_no_window", "x_error": False}
-        except subprocess.CalledProcessError as proc_err:
-            error(f"ERROR: Problem getting window context with hyprctl:\n\t{proc_err}")
-            return NO_CONTEXT_WAS_ERROR
+                self.sock = None
 
+    @ttl_cache
     def get_window_context(self):
         """Return window context to KeyContext"""
-        # return self.get_active_wdw_ctx_hypr_ipc()
-        return self.get_active_wdw_ctx_hyprpy()
-
-
-class Wl_KDE_Plasma_WindowContext(WindowContextProviderInterface):
-    """Window context provider object for Wayland+KDE_Plasma environments"""
-
-    def __init__(self):
-        # import time
-        # import dbus
-        from dbus.exceptions import DBusException
+        # raw socket first, hyprpy builds and validates models on every call.
+        # only fall back when the socket couldn't be opened, hyprpy waits on
+        # the same compositor without any timeout once it is connected
+        ctx = self.get_active_wdw_ctx_hypr_ipc()
+        if ctx is None:
+            return self.get_active_wdw_ctx_hyprpy()
+        return ctx
 
-        self.DBusException      = DBusException
-        self.session_bus        = dbus.SessionBus()
-
-        self.wm_class           = None
-        self.wm_name            = None
-        self.res_name           = None
 
-        # Renamed the D-Bus object/path specifically for Plasma (there are others, like Wlroots)
-        self.toshy_dbus_obj     = 'org.toshy.Plasma'
-        self.toshy_dbus_path    = '/org/toshy/Plasma'
+@register_provider
+class Wl_KDE_Plasma_WindowContext(Toshy_DBus_WindowContext):
+    """
+    Window context provider object for Wayland+KDE_Plasma environments.
+    The Toshy KDE D-Bus service is fed by a KWin script.
+    """
 
-        while True:
-            try:
-                self.proxy_toshy_svc = self.session_bus.get_object( self.toshy_dbus_obj,
-                                                                    self.toshy_dbus_path)
-                self.iface_toshy_svc = dbus.Interface(self.proxy_toshy_svc,
-                                                        self.toshy_dbus_obj)
-                break
-            except self.DBusException as dbus_error:
-                error(f'Error getting Toshy KDE D-Bus service interface.\n\t{dbus_error}')
-            time.sleep(3)
+    # Renamed the D-Bus object/path specifically for Plasma (there are others, like Wlroots)
+    toshy_dbus_obj              = 'org.toshy.Plasma'
+    toshy_dbus_path             = '/org/toshy/Plasma'
+    dbus_svc_name               = 'Toshy KDE D-Bus service'
+    debug_tag                   = 'KDE_DBUS_SVC'
+    # 'resourceClass' is X11/Xorg WM_CLASS equivalent
+    key_wm_class                = 'resource_class'
+    # 'caption' is X11/Xorg WM_NAME equivalent
+    key_wm_name                 = 'caption'
 
     @classmethod
     def get_supported_environments(cls):
@@ -578,79 +818,46 @@ class Wl_KDE_Plasma_WindowContext(WindowContextProviderInterface):
             ('wayland', 'plasma')
         ]
 
-    def get_window_context(self):
-        """
-        Return window context to KeyContext
-        Gets window context info from D-Bus service fed by KWin script
-        """
-        try:
-            # Convert to native Python dict type from 'dbus.Dictionary()' type
-            window_info_dct     = dict(self.iface_toshy_svc.GetActiveWindow())
-        except self.DBusException as dbus_error:
-            error(f'Toshy KDE D-Bus service interface stale?:\n\t{dbus_error}')
-            error(f'Trying to refresh Toshy KDE D-Bus service interface...')
-            try:
-                self.proxy_toshy_svc = self.session_bus.get_object( self.toshy_dbus_obj,
-                                                                    self.toshy_dbus_path)
-                self.iface_toshy_svc = dbus.Interface(  self.proxy_toshy_svc,
-                                                        self.toshy_dbus_obj)
-            except self.DBusException as dbus_error:
-                error(f'Error refreshing Toshy KDE D-Bus service interface.\n\t{dbus_error}')
-            try:
-                # Convert to native Python dict type from 'dbus.Dictionary()' type
-                window_info_dct     = dict(self.iface_toshy_svc.GetActiveWindow())
-                debug(f'Toshy KDE D-Bus service interface restored!')
-            except self.DBusException as dbus_error: 
-                debug(f'Error returned from Toshy KDE D-Bus service:\n\t{dbus_error}')
-                return NO_CONTEXT_WAS_ERROR
-
-        # native_dict = {str(key): str(value) for key, value in dbus_dict.items()}
-        new_wdw_info_dct    = {str(key): str(value) for key, value in window_info_dct.items()}
-        # 'caption' is X11/Xorg WM_NAME equivalent
-        self.wm_name        = new_wdw_info_dct.get('caption', '')
-        # 'resourceClass' is X11/Xorg WM_CLASS equivalent
-        self.wm_class       = new_wdw_info_dct.get('resource_class', '')
-        # 'resourceName' has no X11/Xorg equivalent (tends to be process name?)
-        self.res_name       = new_wdw_info_dct.get('resource_name', '')
-
-        debug(f"KDE_DBUS_SVC: Using D-Bus interface '{self.toshy_dbus_obj}' for window context", ctx='CX')
-
-        return {"wm_class": self.wm_class, "wm_name": self.wm_name, "x_error": False}
-
 
+@register_provider
 class Wl_Cinnamon_WindowContext(WindowContextProviderInterface):
     """Window context provider object for Wayland+Cinnamon environments"""
 
     def __init__(self):
+        import dbus
         from dbus.exceptions import DBusException
 
         self.DBusException          = DBusException
-        session_bus                 = dbus.SessionBus()
+        self.dbus                   = dbus
+        session_bus                 = get_session_bus()
 
         path_toshy_focused_wdw      = "/app/toshy/ToshyFocusedWindow"
         obj_toshy_focused_wdw       = "app.toshy.ToshyFocusedWindow"
         proxy_toshy_focused_wdw     = None
 
+        retry_delays = backoff_delays()
         while proxy_toshy_focused_wdw is None:
             try:
                 proxy_toshy_focused_wdw = session_bus.get_object("org.Cinnamon", path_toshy_focused_wdw)
             except DBusException as dbus_err:
                 error(f"Problem getting D-Bus object: \n\t{dbus_err}")
-                time.sleep(3)
-        self.iface_toshy_focused_wdw = dbus.Interface(proxy_toshy_focused_wdw, obj_toshy_focused_wdw)
+                time.sleep(next(retry_delays))
+        self.iface_toshy_focused_wdw = self.dbus.Interface(proxy_toshy_focused_wdw, obj_toshy_focused_wdw)
 
     @classmethod
     def get_supported_environments(cls):
         # This class supports the Cinnamon environment on Wayland
         return [('wayland', 'cinnamon')]
 
+    @ttl_cache
     def get_window_context(self):
         """
         This function gets the window context from the Toshy Cinnamon extension via D-Bus.
         """
         try:
-            window_info_dbus = self.iface_toshy_focused_wdw.GetFocusedWindowInfo()
-            window_info_dict = json.loads(window_info_dbus)
+            window_info_dbus = self.iface_toshy_focused_wdw.GetFocusedWindowInfo(timeout=self.dbus_timeout)
+            # orjson only takes exact str, not the dbus.String subclass
+            window_info_dict = fast_json.loads(str(window_info_dbus))
 
             wm_class = window_info_dict.get('appClass', '')
             wm_name = window_info_dict.get('windowTitle', '')
@@ -662,30 +869,35 @@ class Wl_Cinnamon_WindowContext(WindowContextProviderInterface):
         return {"wm_class": wm_class, "wm_name": wm_name, "x_error": False}
 
 
+@register_provider
 class Wl_GNOME_WindowContext(WindowContextProviderInterface):
     """Window context provider object for Wayland+GNOME environments"""
 
     def __init__(self):
-        # import dbus
+        import dbus
         from dbus.exceptions import DBusException
 
         self.DBusException          = DBusException
-        session_bus                 = dbus.SessionBus()
+        self.dbus                   = dbus
+        session_bus                 = get_session_bus()
 
         path_focused_wdw            = "/org/gnome/shell/extensions/FocusedWindow"
         obj_focused_wdw             = "org.gnome.shell.extensions.FocusedWindow"
         proxy_focused_wdw           = session_bus.get_object("org.gnome.Shell", path_focused_wdw)
-        self.iface_focused_wdw      = dbus.Interface(proxy_focused_wdw, obj_focused_wdw)
+        self.iface_focused_wdw      = self.dbus.Interface(proxy_focused_wdw, obj_focused_wdw)
 
         path_windowsext             = "/org/gnome/Shell/Extensions/WindowsExt"
         obj_windowsext              = "org.gnome.Shell.Extensions.WindowsExt"
         proxy_windowsext            = session_bus.get_object("org.gnome.Shell", path_windowsext)
-        self.iface_windowsext       = dbus.Interface(proxy_windowsext,obj_windowsext)
+        self.iface_windowsext       = self.dbus.Interface(proxy_windowsext,obj_windowsext)
 
         path_xremap                 = "/com/k0kubun/Xremap"
         obj_xremap                  = "com.k0kubun.Xremap"
         proxy_xremap                = session_bus.get_object("org.gnome.Shell", path_xremap)
-        self.iface_xremap           = dbus.Interface(proxy_xremap, obj_xremap)
+        self.iface_xremap           = self.dbus.Interface(proxy_xremap, obj_xremap)
+
+        proxy_shell_exts            = session_bus.get_object("org.gnome.Shell", "/org/gnome/Shell")
+        self.iface_shell_exts       = self.dbus.Interface(proxy_shell_exts, "org.gnome.Shell.Extensions")
 
         self.last_good_ext_uuid     = None
         self.cycle_count            = 0
@@ -701,12 +913,18 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
             self.ext_uuid_windowsext:   self.get_wl_gnome_dbus_windowsext_context,
             self.ext_uuid_focused_wdw:  self.get_wl_gnome_dbus_focused_wdw_context,
         }
+        # compatible extensions GNOME Shell reports as enabled, None if unknown
+        self.enabled_ext_uuids      = None
+        # (uuid, query method) pairs, starting with the last good extension
+        self.ordered_extensions     = list(self.GNOME_SHELL_EXTENSIONS.items())
+        self.probe_enabled_extensions()
 
     @classmethod
     def get_supported_environments(cls):
         # This class supports the GNOME environment on Wayland
         return [('wayland', 'gnome')]
 
+    @ttl_cache
     def get_window_context(self):
         """
         This function gets the window context from one of the compatible 
@@ -718,37 +936,33 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
         If it fails, it tries the others. If all fail, it returns an error.
         """
 
-        # Order of the extensions
-        extension_uuids = list(self.GNOME_SHELL_EXTENSIONS.keys())
-
-        # If we have a last successful extension
-        if self.last_good_ext_uuid in extension_uuids:
-            starting_index = extension_uuids.index(self.last_good_ext_uuid)
-        else:
-            # We don't have a last successful extension, so start from the first
-            starting_index = 0
-
-        # Create a new list that starts with the last successful extension, followed by the others
-        ordered_extensions = extension_uuids[starting_index:] + extension_uuids[:starting_index]
-
-        for extension_uuid in ordered_extensions:
+        for extension_uuid, get_ext_context in self.ordered_extensions:
             try:
                 # Call the function associated with the extension
-                context = self.GNOME_SHELL_EXTENSIONS[extension_uuid]()
+                context = get_ext_context()
             except self.DBusException as dbus_err:
-                dbus_err = str(dbus_err).replace("Object does not exist", "\n\t Object does not exist")
-                debug(f"Error querying GNOME Shell extension '{extension_uuid}':\n\t{dbus_err}")
+                if logger.VERBOSE:
+                    dbus_err = str(dbus_err).replace("Object does not exist", "\n\t Object does not exist")
+                    debug(f"Error querying GNOME Shell extension '{extension_uuid}':\n\t{dbus_err}")
                 # Continue to the next extension
                 continue
             else:
                 # No exceptions were thrown, so this extension is now the preferred one
-                self.last_good_ext_uuid = extension_uuid
+                if extension_uuid != self.last_good_ext_uuid:
+                    self.last_good_ext_uuid = extension_uuid
+                    self.reorder_extensions()
                 self.dbus_err_cnt = 0
-                debug(f"SHELL_EXT: Using UUID '{self.last_good_ext_uuid}' for window context", ctx='CX')
+                if logger.VERBOSE:
+                    debug(f"SHELL_EXT: Using UUID '{self.last_good_ext_uuid}' for window context", ctx='CX')
                 return context
 
         # If we reach here, it means all extensions have failed
-        self.last_good_ext_uuid = None
+        if self.last_good_ext_uuid is not None:
+            self.last_good_ext_uuid = None
+            self.reorder_extensions()
+        if self.dbus_err_cnt == 0:
+            # extensions may have been enabled or disabled since the last probe
+            self.probe_enabled_extensions()
 
         if self.dbus_err_cnt >= self.max_dbus_err_cnt:
             self.dbus_err_cnt = 0
@@ -763,6 +977,42 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
 
         return NO_CONTEXT_WAS_ERROR
 
+    def reorder_extensions(self):
+        """
+        Put the last successful extension first, followed by the others in their
+        usual order. Without a last successful extension, use the usual order.
+        Extensions known to be disabled are left out.
+        Only needed when the last good extension changes, not on every query.
+        """
+        extensions = list(self.GNOME_SHELL_EXTENSIONS.items())
+        if self.last_good_ext_uuid in self.GNOME_SHELL_EXTENSIONS:
+            start_idx = list(self.GNOME_SHELL_EXTENSIONS).index(self.last_good_ext_uuid)
+            extensions = extensions[start_idx:] + extensions[:start_idx]
+        if self.enabled_ext_uuids:
+            extensions = [ext for ext in extensions if ext[0] in self.enabled_ext_uuids]
+        self.ordered_extensions = extensions
+
+    def probe_enabled_extensions(self):
+        """
+        Ask GNOME Shell once which of the compatible extensions are enabled, so
+        the others are never queried. If the list can't be had, or none of them
+        are enabled, all of them stay in rotation.
+        """
+        try:
+            shell_exts = self.iface_shell_exts.ListExtensions(timeout=self.dbus_timeout)
+        except self.DBusException as dbus_err:
+            debug(f"SHELL_EXT: Could not list GNOME Shell extensions:\n\t{dbus_err}")
+            enabled = None
+        else:
+            # state 1 is ENABLED (ACTIVE in newer GNOME Shell versions)
+            enabled = { uuid for uuid, info in shell_exts.items()
+                        if uuid in self.GNOME_SHELL_EXTENSIONS and info.get('state') == 1 }
+        if enabled != self.enabled_ext_uuids:
+            self.enabled_ext_uuids = enabled
+            if enabled:
+                debug(f"SHELL_EXT: Enabled compatible extensions: {sorted(enabled)}")
+            self.reorder_extensions()
+
     def show_error_all_exts_failed(self):
         """Print out informative error about all shell extensions failing to respond."""
         print()
@@ -785,9 +1035,9 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
         wm_name             = ''
         
         try:
-            focused_wdw_dbus    = self.iface_focused_wdw.Get()
+            focused_wdw_dbus    = self.iface_focused_wdw.Get(timeout=self.dbus_timeout)
             # print(f'{focused_wdw_dbus = }')
-            focused_wdw_dct     = json.loads(focused_wdw_dbus)
+            focused_wdw_dct     = fast_json.loads(str(focused_wdw_dbus))
             # print(f'{focused_wdw_dct = }')
 
             wm_class            = focused_wdw_dct.get('wm_class', '')
@@ -795,7 +1045,9 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
         except self.DBusException as dbus_error:
             # This will be the error if no window info found (e.g., GNOME desktop):
             # org.gnome.gjs.JSError.Error: No window in focus
-            if 'No window in focus' in str(dbus_error): pass
+            # (check the error name first, no need to format the whole exception)
+            if (dbus_error.get_dbus_name() == 'org.gnome.gjs.JSError.Error' and
+                    'No window in focus' in (dbus_error.get_dbus_message() or '')): pass
             else: raise   # pass on the original exception if not 'No window in focus'
 
         return {"wm_class": wm_class, "wm_name": wm_name, "x_error": False}
@@ -805,8 +1057,8 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
         wm_class            = ''
         wm_name             = ''
 
-        wm_class            = str(self.iface_windowsext.FocusClass())
-        wm_name             = str(self.iface_windowsext.FocusTitle())
+        wm_class            = str(self.iface_windowsext.FocusClass(timeout=self.dbus_timeout))
+        wm_name             = str(self.iface_windowsext.FocusTitle(timeout=self.dbus_timeout))
 
         return {"wm_class": wm_class, "wm_name": wm_name, "x_error": False}
 
@@ -817,8 +1069,8 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
         wm_class            = ''
         wm_name             = ''
 
-        active_window_dbus  = self.iface_xremap.ActiveWindow()
-        active_window_dct   = json.loads(active_window_dbus)
+        active_window_dbus  = self.iface_xremap.ActiveWindow(timeout=self.dbus_timeout)
+        active_window_dct   = fast_json.loads(str(active_window_dbus))
 
         # use get() with default value to avoid KeyError for 
         # GNOME Shell/desktop lack of properties returned
@@ -829,11 +1081,14 @@ class Wl_GNOME_WindowContext(WindowContextProviderInterface):
         return {"wm_class": wm_class, "wm_name": wm_name, "x_error": False}
 
 
+@register_provider
 class Xorg_WindowContext(WindowContextProviderInterface):
     """Window context provider object for X11/Xorg environments"""
 
     def __init__(self):
         self._display = None
+        # interned along with each new display connection, not per query
+        self._atom_net_wm_name = None
 
         # Import Xlib modules here
         from Xlib.xobject.drawable import Window
@@ -858,18 +1113,22 @@ class Xorg_WindowContext(WindowContextProviderInterface):
         # This class supports any desktop environment in X11/Xorg sessions
         return [('x11', None)]
 
+    @ttl_cache
     def get_window_context(self):
         """
         Get window context from Xorg, window name, class,
         whether there is an X error or not
         """
         try:
-            self._display = self._display or self.Display()
+            if self._display is None:
+                self._display = self.Display()
+                self._atom_net_wm_name = self._display.get_atom("_NET_WM_NAME")
             wm_class    = ""
             wm_name     = ""
 
             input_focus = self._display.get_input_focus().focus
-            window      = self.get_actual_window(input_focus)
+            # the properties were already fetched while looking for the actual window
+            window, net_wm_name, pair = self.get_actual_window(input_focus)
             if window:
                 # We use _NET_WM_NAME string (UTF-8) here instead of WM_NAME to 
                 # bypass (COMPOUND_TEXT) encoding problems when non-ASCII
@@ -882,18 +1141,18 @@ class Xorg_WindowContext(WindowContextProviderInterface):
                 
                 # Mitigation for '_NET_WM_NAME' not being set at all(!), but WM_NAME is good:
                 # (this was observed in KDE 4.x application launcher/menu)
-                wm_name = window.get_full_text_property(self._display.get_atom("_NET_WM_NAME"))
+                wm_name = net_wm_name
                 if wm_name is None:
                     error(f'Xlib _NET_WM_NAME query returned NoneType, falling back to WM_NAME')
                     wm_name = window.get_wm_name()
                     if isinstance(wm_name, bytes):
                         error(f'Xlib WM_NAME query returned bytes object, falling back to error string')
                         wm_name = "ERR: Xorg_WindowContext: Bad _NET_WM_NAME and WM_NAME"
-                pair    = window.get_wm_class()
                 if pair:
                     wm_class = str(pair[1])
             
-            debug(f"CTX_X11: Using Xlib for window context", ctx='CX')
+            if logger.VERBOSE:
+                debug("CTX_X11: Using Xlib for window context", ctx='CX')
 
             return {"wm_class": wm_class, "wm_name": wm_name, "x_error": False}
 
@@ -913,40 +1172,38 @@ class Xorg_WindowContext(WindowContextProviderInterface):
             return NO_CONTEXT_WAS_ERROR
 
     def get_actual_window(self, window):
-        if not isinstance(window, self.Window):
-            return None
+        """
+        Walk up from the focused window to the one that actually has the
+        properties. Returns (window, _NET_WM_NAME, WM_CLASS pair), or a
+        tuple of Nones if there is no such window.
+        """
+        while isinstance(window, self.Window):
+            try:
+                # use _NET_WM_NAME string instead of WM_NAME to bypass (COMPOUND_TEXT) encoding problems
+                wmname = window.get_full_text_property(self._atom_net_wm_name)
+                wmclass = window.get_wm_class()
+            except self.BadWindow as xerror:
+                error(xerror)
+                break  # or do some appropriate handling here
+            except self.BadValue as xerror:
+                error(xerror)
+                break  # or do some appropriate handling here
+
+            # workaround for Java app
+            # https://github.com/JetBrains/jdk8u_jdk/blob/master/src/solaris/classes/sun/awt/X11/XFocusProxyWindow.java#L35
+            if (wmclass is None and wmname is None) or "FocusProxy" in (wmclass or ""):
+                window = window.query_tree().parent
+                continue
 
-        # # use _NET_WM_NAME string instead of WM_NAME to bypass (COMPOUND_TEXT) encoding problems
-        # wmname = window.get_full_text_property(self._display.get_atom("_NET_WM_NAME"))
-        # wmclass = window.get_wm_class()
+            return window, wmname, wmclass
 
-        try:
-            # use _NET_WM_NAME string instead of WM_NAME to bypass (COMPOUND_TEXT) encoding problems
-            wmname = window.get_full_text_property(self._display.get_atom("_NET_WM_NAME"))
-            wmclass = window.get_wm_class()
-        except self.BadWindow as xerror:
-            error(xerror)
-            return None  # or do some appropriate handling here
-        except self.BadValue as xerror:
-            error(xerror)
-            return None  # or do some appropriate handling here
-
-        # workaround for Java app
-        # https://github.com/JetBrains/jdk8u_jdk/blob/master/src/solaris/classes/sun/awt/X11/XFocusProxyWindow.java#L35
-        if (wmclass is None and wmname is None) or "FocusProxy" in (wmclass or ""):
-            parent_window = window.query_tree().parent
-            if parent_window:
-                return self.get_actual_window(parent_window)
-            return None
-
-        return window
+        return None, None, None
 
 
 ###############################################################################################
-# ALL SPECIFIC PROVIDER CLASSES MUST BE DEFINED BEFORE/ABOVE THIS GENERIC PROVIDER!!!
-# This class is responsible for making a list of the environments supported
-# by all the specific provider classes in this module, and redirecting the
-# rest of the keymapper code to the correct specific provider. 
+# ALL SPECIFIC PROVIDER CLASSES MUST BE DECORATED WITH @register_provider!!!
+# This class redirects the rest of the keymapper code to the correct specific
+# provider, out of those registered for the environments they support.
 
 # Generic class for the rest of the code to interact with
 class WindowContextProvider(WindowContextProviderInterface):
@@ -954,23 +1211,27 @@ class WindowContextProvider(WindowContextProviderInterface):
     _instance = None
 
     # Mapping of environments to provider classes
-    environment_class_map = {
-        env: cls for cls in WindowContextProviderInterface.__subclasses__()
-        for env in cls.get_supported_environments()
-    }
+    environment_class_map = _PROVIDERS
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(WindowContextProvider, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, session_type, wl_desktop_env) -> None:
+    def __init__(self, session_type, wl_desktop_env, context_ttl=None) -> None:
 
         env = (session_type, wl_desktop_env)
         if env not in self.environment_class_map:
             raise ValueError(f"Unsupported environment: {env}")
 
         self._provider = self.environment_class_map[env]()
+        if context_ttl is not None:
+            self._provider.context_ttl = context_ttl
+
+        # the provider does its own caching (`ttl_cache`) and signal handling,
+        # this is a singleton created once, so the provider's method can simply
+        # replace ours and every event skips a call layer
+        self.get_window_context = self._provider.get_window_context
 
     def get_window_context(self):
         return self._provider.get_window_context()
@@ -979,8 +1240,3 @@ class WindowContextProvider(WindowContextProviderInterface):
     def get_supported_environments(cls):
         # This generic class does not directly support any environments
         return []
-
-# ALL SPECIFIC PROVIDER CLASSES MUST BE DEFINED BEFORE/ABOVE THIS GENERIC PROVIDER!!!
-# This class is responsible for making a list of the environments supported
-# by all the specific provider classes in this module, and redirecting the
-# rest of the keymapper code to the correct specific provider. 
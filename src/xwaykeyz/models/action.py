@@ -7,7 +7,7 @@ class Action(IntEnum):
     RELEASE, PRESS, REPEAT = range(3)
 
     def is_pressed(self):
-        return self == Action.PRESS or self == Action.REPEAT
+        return self in PRESSED_ACTIONS
 
     def just_pressed(self):
         return self == Action.PRESS
@@ -26,3 +26,6 @@ class Action(IntEnum):
 PRESS = Action.PRESS
 RELEASE = Action.RELEASE
 REPEAT = Action.REPEAT
+
+# set lookups are much cheaper than the method calls above, use on hot paths
+PRESSED_ACTIONS = frozenset((PRESS, REPEAT))
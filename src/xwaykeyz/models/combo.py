@@ -1,8 +1,6 @@
 from collections.abc import Iterable
 from enum import IntEnum, unique
 
-from ordered_set import OrderedSet
-
 from .key import Key
 from .modifier import Modifier
 
@@ -23,10 +21,11 @@ class Combo:
 
         if isinstance(modifiers, set):
             raise ValueError("modifiers needs ordered sequence, not a set")
+        # dicts keep insertion order, so this drops duplicates in order
         if isinstance(modifiers, Iterable):
-            modifiers = OrderedSet(modifiers)
+            modifiers = list(dict.fromkeys(modifiers))
         elif isinstance(modifiers, Modifier):
-            modifiers = OrderedSet([modifiers])
+            modifiers = [modifiers]
         else:
             raise ValueError("modifiers should be Iterable")
 
@@ -35,6 +34,11 @@ class Combo:
 
         self._modifiers = modifiers
         self._key = key
+        # a pressed combo is looked up in every active keymap, so work out
+        # the order-independent identity once rather than on every lookup
+        self._modifier_set = frozenset(modifiers)
+        self._hash = hash((self._modifier_set, key))
+        self._modifier_keys = None
 
     @property
     def modifiers(self):
@@ -44,17 +48,27 @@ class Combo:
     def key(self):
         return self._key
 
+    @property
+    def modifier_keys(self):
+        # every key that satisfies one of the modifiers, only asked of
+        # output combos, so work it out on first use rather than up front
+        if self._modifier_keys is None:
+            self._modifier_keys = frozenset(
+                key for mod in self._modifiers for key in mod.get_keys()
+            )
+        return self._modifier_keys
+
     def __eq__(self, other):
         if isinstance(other, Combo):
             return (
-                set(self.modifiers) == set(other.modifiers)
+                self._modifier_set == other._modifier_set
                 and self.key == other.key
             )
         else:
             return NotImplemented
 
     def __hash__(self):
-        return hash((frozenset(self.modifiers), self.key))
+        return self._hash
 
     def __str__(self):
         return "-".join([str(mod) for mod in self.modifiers] + [self.key.name])
@@ -64,5 +78,5 @@ class Combo:
 
     def with_modifier(self, modifiers):
         if isinstance(modifiers, Modifier):
-            modifiers = {modifiers}
-        return Combo(self.modifiers | modifiers, self.key)
+            modifiers = [modifiers]
+        return Combo([*self.modifiers, *modifiers], self.key)
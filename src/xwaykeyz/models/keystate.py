@@ -1,35 +1,80 @@
 import time as _time
-from dataclasses import dataclass, field, replace
 
-from .action import Action
+from .action import Action, PRESSED_ACTIONS
 from .key import Key
 
 
-@dataclass
 class Keystate:
-    # the actual REAL key pressed
-    inkey: Key
-    action: Action
-    prior: "Keystate" = None
-    time: float = field(default_factory=_time.time)
-    # the key we modmapped to
-    key: Key = None
-    # the modifier we may modmap to (multi-key) if used
-    # as part of a combo or held for a certain time period
-    multikey: Key = None
-    # whether this key is currently suspended inside the
-    # transform engine waiting for other input
-    suspended: bool = False
-    is_multi: bool = False
-    exerted_on_output: bool = False
-    # if this keystate was spent by executing a combo
-    spent: bool = False
+    # one of these is created or updated for every key event, a plain
+    # class with __slots__ is smaller and faster than a dataclass here
+    __slots__ = (
+        "inkey",
+        "action",
+        "time",
+        "key",
+        "multikey",
+        "suspended",
+        "is_multi",
+        "exerted_on_output",
+        "spent",
+    )
+
+    def __init__(
+        self,
+        # the actual REAL key pressed
+        inkey: Key,
+        action: Action,
+        time: float = None,
+        # the key we modmapped to
+        key: Key = None,
+        # the modifier we may modmap to (multi-key) if used
+        # as part of a combo or held for a certain time period
+        multikey: Key = None,
+        # whether this key is currently suspended inside the
+        # transform engine waiting for other input
+        suspended: bool = False,
+        is_multi: bool = False,
+        exerted_on_output: bool = False,
+        # if this keystate was spent by executing a combo
+        spent: bool = False,
+    ):
+        self.inkey = inkey
+        self.action = action
+        self.time = _time.time() if time is None else time
+        self.key = key
+        self.multikey = multikey
+        self.suspended = suspended
+        self.is_multi = is_multi
+        self.exerted_on_output = exerted_on_output
+        self.spent = spent
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Keystate({fields})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    # mutable, like the dataclass it replaces
+    __hash__ = None
 
     def copy(self):
-        return replace(self)
+        return Keystate(
+            self.inkey,
+            self.action,
+            self.time,
+            self.key,
+            self.multikey,
+            self.suspended,
+            self.is_multi,
+            self.exerted_on_output,
+            self.spent,
+        )
 
     def is_pressed(self):
-        return self.action == Action.PRESS or self.action == Action.REPEAT
+        return self.action in PRESSED_ACTIONS
 
     def resolve_as_momentary(self):
         # self.key = self.key # NOP
@@ -2,23 +2,38 @@ from .key import Key
 
 
 class Modifier:
-    """represents a keyboard combo modifier, such as Shift or Cmd"""
+    """
+    represents a keyboard combo modifier, such as Shift or Cmd
+
+    every modifier is created once and registered by name, so the default
+    identity based equality and hashing are all that is needed
+    """
+
+    __slots__ = ("name", "aliases", "keys", "_first_key", "_is_specific", "_left", "_right")
 
     _BY_KEY = {}
     _MODIFIERS = {}
-    _IDS = iter(range(100))
+    _BY_ALIAS = {}
+    # replaced (never mutated) whenever a modifier brings new aliases
+    _ALL_ALIASES = ()
 
     def __init__(self, name, aliases, key=None, keys=None):
         cls = type(self)
-        self._id = next(cls._IDS)
         self.name = name
         self.aliases = aliases
-        keys = key or keys
-        if isinstance(keys, Key):
-            keys = [keys]
-        self.keys = keys
-        if len(self.keys) == 1:
-            key = self.keys[0]
+        # `key is not None` rather than `key or keys`, Key.RESERVED is 0
+        if key is not None:
+            keys = (key,)
+        elif isinstance(keys, Key):
+            keys = (keys,)
+        # never changes after this, answer the combo matching questions now
+        self.keys = tuple(keys)
+        self._first_key = self.keys[0]
+        self._is_specific = len(self.keys) == 1
+        self._left = None
+        self._right = None
+        if self._is_specific:
+            key = self._first_key
             if key in cls._BY_KEY:
                 raise ValueError(
                     f"modifier {name} may not be assigned {key},"
@@ -28,7 +43,24 @@ class Modifier:
         if name in cls._MODIFIERS:
             raise ValueError(f"existing modifier named {name} already exists")
         cls._MODIFIERS[name] = self
+        for alias in aliases:
+            # the first modifier to claim an alias keeps it
+            cls._BY_ALIAS.setdefault(alias, self)
+        if len(cls._BY_ALIAS) != len(cls._ALL_ALIASES):
+            Modifier._ALL_ALIASES = tuple(cls._BY_ALIAS)
         setattr(Modifier, name, self)
+        self._link_sides()
+
+    def _link_sides(self):
+        # resolve the left/right variants once instead of on every lookup,
+        # they may be registered before or after the generic modifier
+        mods = Modifier._MODIFIERS
+        if self.name.startswith("L_") and self.name[2:] in mods:
+            mods[self.name[2:]]._left = self
+        elif self.name.startswith("R_") and self.name[2:] in mods:
+            mods[self.name[2:]]._right = self
+        self._left = mods.get("L_" + self.name)
+        self._right = mods.get("R_" + self.name)
 
     def __str__(self):
         return self.aliases[0]
@@ -36,32 +68,20 @@ class Modifier:
     def __repr__(self):
         return self.aliases[0] + f"<Key.{self.keys[0]}>"
 
-    def __eq__(self, other):
-        return self._id == other._id
-
-    def __hash__(self):
-        return self._id
-
     def is_specific(self):
-        return len(self.keys) == 1
+        return self._is_specific
 
     def get_keys(self):
         return self.keys
 
     def get_key(self):
-        return self.keys[0]
+        return self._first_key
 
     def to_left(self):
-        try:
-            return getattr(Modifier, "L_" + self.name)
-        except AttributeError:
-            return None
+        return self._left
 
     def to_right(self):
-        try:
-            return getattr(Modifier, "R_" + self.name)
-        except AttributeError:
-            return None
+        return self._right
 
     @classmethod
     def from_key(cls, key):
@@ -69,8 +89,7 @@ class Modifier:
 
     @classmethod
     def all_aliases(cls):
-        mods = cls._MODIFIERS.values()
-        return [alias for mod in mods for alias in mod.aliases]
+        return cls._ALL_ALIASES
 
     @classmethod
     def is_key_modifier(cls, key):
@@ -78,10 +97,7 @@ class Modifier:
 
     @classmethod
     def from_alias(cls, alias):
-        for mod in cls._MODIFIERS.values():
-            if alias in mod.aliases:
-                return mod
-        return None
+        return cls._BY_ALIAS.get(alias)
 
 
 # create all the default modifiers we ship with
@@ -1,4 +1,6 @@
 class Modmap:
+    __slots__ = ("name", "mappings", "conditional")
+
     def __init__(self, name, mappings, when=None):
         self.name = name
         self.mappings = mappings
@@ -12,6 +14,8 @@ class Modmap:
 
 
 class MultiModmap:
+    __slots__ = ("name", "mappings", "conditional")
+
     def __init__(self, name, mappings, when=None):
         self.name = name
         self.mappings = mappings
@@ -1,9 +1,12 @@
+import os
+import struct
 import time
 from evdev import ecodes
 from evdev.uinput import UInput
 
+from .lib import logger
 from .lib.logger import debug
-from .models.action import PRESS, RELEASE
+from .models.action import PRESS, PRESSED_ACTIONS, RELEASE
 from .models.combo import Combo
 from .models.modifier import Modifier
 from .config_api import _THROTTLES
@@ -48,8 +51,18 @@ _TOUCHPAD_BUTTONS = {
     339: "BTN_TOOL_QUINTTAP2",                                  # second quintuple tap on a touchpad
 }
 _KEYBOARD_KEYS.update(_TOUCHPAD_BUTTONS)
+_KEYBOARD_KEYS = frozenset(_KEYBOARD_KEYS)
+
+# REL_X, REL_Y, REL_HWHEEL, REL_WHEEL, REL_MISC
+_REL_EVENTS = frozenset((0, 1, 6, 8, 9))
 
 _uinput = None
+# file descriptor of a real uinput device, frames are written to it directly
+_uinput_fd = None
+
+# struct input_event, the kernel stamps the time itself so it's left at 0
+_INPUT_EVENT = struct.Struct("llHHi")
+_SYN_REPORT = _INPUT_EVENT.pack(0, 0, ecodes.EV_SYN, ecodes.SYN_REPORT, 0)
 
 
 # for use with throttle delays
@@ -64,35 +77,53 @@ def real_uinput():
         name=f"{VIRT_DEVICE_PREFIX} Keyboard",
         events={
             ecodes.EV_KEY: _KEYBOARD_KEYS,
-            ecodes.EV_REL: set([0, 1, 6, 8, 9]),
+            ecodes.EV_REL: _REL_EVENTS,
         },
     )
 
 
 # TODO: improve injection?
 def setup_uinput(uinput=None):
-    global _uinput
+    global _uinput, _uinput_fd
     _uinput = uinput or real_uinput()
+    _uinput_fd = _uinput.fd if isinstance(_uinput, UInput) else None
 
 
 class Output:
+    __slots__ = (
+        "_pressed_modifier_keys",
+        "_pressed_keys",
+        "_suspended_mod_keys",
+        "_suspend_depth",
+        "_event_buffer",
+        "_pending_delay_ms",
+        "_resume_at",
+    )
+
     def __init__(self):
         self._pressed_modifier_keys = set()
         self._pressed_keys = set()
-        self._suspended_mod_keys = []
+        # insertion ordered, a key lifted by several combos is re-exerted once
+        self._suspended_mod_keys = {}
         self._suspend_depth = 0
+        # (key, action) pairs held back while a combo is being sent, None otherwise
+        self._event_buffer = None
+        # throttle delay owed before the next buffered event goes out
+        self._pending_delay_ms = 0
+        # monotonic time the trailing delay of the last combo runs out at
+        self._resume_at = 0
 
     def __update_pressed_modifier_keys(self, key, action):
         if not Modifier.is_key_modifier(key):
             return
 
-        if action.is_pressed():
+        if action in PRESSED_ACTIONS:
             self._pressed_modifier_keys.add(key)
         else:
             self._pressed_modifier_keys.discard(key)
 
     def __update_pressed_keys(self, key, action):
-        if action.is_pressed():
+        if action in PRESSED_ACTIONS:
             self._pressed_keys.add(key)
         else:
             self._pressed_keys.discard(key)
@@ -124,95 +155,123 @@ class Output:
     def send_key_action(self, key, action):
         self.__update_pressed_modifier_keys(key, action)
         self.__update_pressed_keys(key, action)
-        _uinput.write(ecodes.EV_KEY, key, action)
-        debug(action, key, time.time(), ctx="OO")
-        self.__send_sync()
+        if logger.VERBOSE:
+            debug(action, key, time.time(), ctx="OO")
+        if self._event_buffer is not None:
+            if self._pending_delay_ms:
+                self.__sleep_pending()
+            self._event_buffer.append((key, action))
+            return
+        if self._resume_at:
+            self.__wait_for_resume()
+        self.__write_frame(((key, action),))
+
+    def __write_frame(self, key_actions):
+        if _uinput_fd is None:
+            for key, action in key_actions:
+                _uinput.write(ecodes.EV_KEY, key, action)
+            self.__send_sync()
+            return
+        # the whole frame, SYN_REPORT included, in a single write() call
+        pack = _INPUT_EVENT.pack
+        EV_KEY = ecodes.EV_KEY
+        os.write(
+            _uinput_fd,
+            b"".join([pack(0, 0, EV_KEY, key, action) for key, action in key_actions])
+            + _SYN_REPORT,
+        )
+
+    def _flush(self):
+        # write out everything buffered so far as a single input frame
+        if self._event_buffer:
+            self.__write_frame(self._event_buffer)
+            self._event_buffer.clear()
+
+    def __pause(self, msec):
+        # back to back delays (post-delay of one key, pre-delay of the next)
+        # add up and are slept off in one go before the next event
+        self._pending_delay_ms += msec
+
+    def __sleep_pending(self):
+        # anything buffered has to reach the output before we wait, the
+        # delays exist so that apps see the events spaced out in time
+        self._flush()
+        sleep_ms(self._pending_delay_ms)
+        self._pending_delay_ms = 0
+
+    def __wait_for_resume(self):
+        # only wait out whatever is left of the trailing delay, if the
+        # next key comes along later than that there is nothing to do
+        remaining = self._resume_at - time.monotonic()
+        self._resume_at = 0
+        if remaining > 0:
+            time.sleep(remaining)
 
     def send_combo(self, combo: Combo):
+        if self._resume_at:
+            self.__wait_for_resume()
+        self._event_buffer = []
+        self._pending_delay_ms = 0
+        try:
+            self.__send_combo(combo)
+        finally:
+            events, self._event_buffer = self._event_buffer, None
+            if events:
+                self.__write_frame(events)
+        # the trailing post-delay only has to separate this combo from
+        # whatever is output next, so don't block on it here
+        if self._pending_delay_ms:
+            self._resume_at = time.monotonic() + self._pending_delay_ms / 1000
+            self._pending_delay_ms = 0
+
+    def __send_combo(self, combo: Combo):
         released_mod_keys       = []
         pressed_mod_keys        = []
-
-        mod_keys_we_need_to_lift = self._pressed_modifier_keys.copy()
-        mods_we_need_to_press = combo.modifiers.copy()
-        for pressed_key in self._pressed_modifier_keys:
-            for modifier in combo.modifiers:
-                if pressed_key in modifier.get_keys():
-                    # already held down, we don't need to press or lift
-                    mod_keys_we_need_to_lift.remove(pressed_key)
-
-                    # Fix to prevent KeyError exception when both left/right of same mod key used in
-                    # the input combo, and generic form of that mod is/was in mods_we_need_to_press:
-                    if modifier in mods_we_need_to_press:
-                        mods_we_need_to_press.remove(modifier)
-                    else:
-                        debug(f"Skipping redundant removal of modifier: {modifier}")
-                    # TODO: The above "fix" needs to be deeply examined for possible side effects. 
-
-
-        #############################################################################################
-        #############################################################################################
-        # # DEBUGGING VERSION OF THE ABOVE CODE BLOCK (LEFT AND RIGHT VARIANTS OF MODIFIER
-        # # USED TOGETHER IN INPUT COMOBO CAUSE EXCEPTION IF GENERIC MODIFIER IS IN OUTPUT COMBO)
-        # print()
-        # mod_keys_we_need_to_lift = self._pressed_modifier_keys.copy()
-        # debug(f"######  {mod_keys_we_need_to_lift           = }")
-        # mods_we_need_to_press = combo.modifiers.copy()
-        # debug(f"######  {mods_we_need_to_press              = }")
-        # print()
-        # debug(f"########  {self._pressed_modifier_keys      = }")
-        # for pressed_key in self._pressed_modifier_keys:
-        #     debug(f"########  outer for loop: {pressed_key      = }")
-        #     debug(f"########  outer for loop: {combo.modifiers  = }")
-        #     print()
-        #     for modifier in combo.modifiers:
-        #         debug(f"##########  inner for loop: {modifier               = }")
-        #         debug(f"##########  inner for loop: {modifier.get_keys()    = }")
-        #         print()
-        #         if pressed_key in modifier.get_keys():
-        #             debug(f"############  removing key: {pressed_key                = }")
-        #             # already held down, we don't need to press or lift
-        #             debug(f"############  before remove: {mod_keys_we_need_to_lift  = }")
-        #             debug(f"############  before remove: {mods_we_need_to_press     = }")
-        #             mod_keys_we_need_to_lift.remove(pressed_key)
-        #             mods_we_need_to_press.remove(modifier)
-        #             debug(f"############  after remove: {mod_keys_we_need_to_lift   = }")
-        #             debug(f"############  after remove: {mods_we_need_to_press      = }")
-        #         print()
-        #############################################################################################
-        #############################################################################################
-
-
-        for key in reversed(list(mod_keys_we_need_to_lift)):
-            sleep_ms(_THROTTLES['key_pre_delay_ms'])
+        pre_delay_ms            = _THROTTLES['key_pre_delay_ms']
+        post_delay_ms           = _THROTTLES['key_post_delay_ms']
+
+        held_mod_keys = self._pressed_modifier_keys
+        # a modifier that is already held down (either side, for the
+        # generic ones) doesn't need pressing, and those held keys stay put
+        mods_we_need_to_press = [
+            mod for mod in combo.modifiers if held_mod_keys.isdisjoint(mod.get_keys())
+        ]
+        combo_mod_keys = combo.modifier_keys
+        mod_keys_we_need_to_lift = [
+            key for key in held_mod_keys if key not in combo_mod_keys
+        ]
+
+        for key in reversed(mod_keys_we_need_to_lift):
+            self.__pause(pre_delay_ms)
             self.send_key_action(key, RELEASE)
-            sleep_ms(_THROTTLES['key_post_delay_ms'])
+            self.__pause(post_delay_ms)
             released_mod_keys.append(key)
 
         for key in [mod.get_key() for mod in mods_we_need_to_press]:
-            sleep_ms(_THROTTLES['key_pre_delay_ms'])
+            self.__pause(pre_delay_ms)
             self.send_key_action(key, PRESS)
-            sleep_ms(_THROTTLES['key_post_delay_ms'])
+            self.__pause(post_delay_ms)
             pressed_mod_keys.append(key)
 
         # normal key portion of the combo
-        sleep_ms(_THROTTLES['key_pre_delay_ms'])
+        self.__pause(pre_delay_ms)
         self.send_key_action(combo.key, PRESS)
-        sleep_ms(6)
+        self.__pause(6)
         self.send_key_action(combo.key, RELEASE)
-        sleep_ms(_THROTTLES['key_post_delay_ms'])
+        self.__pause(post_delay_ms)
 
         for modifier in reversed(pressed_mod_keys):
-            sleep_ms(_THROTTLES['key_pre_delay_ms'])
+            self.__pause(pre_delay_ms)
             self.send_key_action(modifier, RELEASE)
-            sleep_ms(_THROTTLES['key_post_delay_ms'])
+            self.__pause(post_delay_ms)
 
         if self.__is_suspending():  # sleep the keys
-            self._suspended_mod_keys.extend(released_mod_keys)
+            self._suspended_mod_keys.update(dict.fromkeys(released_mod_keys))
         else:  # reassert the keys
             for modifier in reversed(released_mod_keys):
-                sleep_ms(_THROTTLES['key_pre_delay_ms'])
+                self.__pause(pre_delay_ms)
                 self.send_key_action(modifier, PRESS)
-                sleep_ms(_THROTTLES['key_post_delay_ms'])
+                self.__pause(post_delay_ms)
 
     def send_key(self, key):
         self.send_combo(Combo(None, key))
@@ -228,7 +287,7 @@ class Output:
 
     # ─── SUSPEND ──────────────────────────────────────────────────────────────────
 
-    # self._suspended_mod_keys : list
+    # self._suspended_mod_keys : dict (keys only, used as an ordered set)
     # self._suspend_depth : int
 
     def suspend_when_lifting(self):
@@ -264,6 +323,8 @@ class SuspendWhenLifting:
     unsuspended (which is currently immediately when a sequence ends)
     """
 
+    __slots__ = ("_output",)
+
     def __init__(self, output):
         self._output = output
 
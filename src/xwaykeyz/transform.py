@@ -5,11 +5,12 @@ import inspect
 from evdev import ecodes, InputEvent
 from typing import Dict, List
 
-from .config_api import escape_next_key, get_configuration, ignore_key, _ENVIRON, _REPEATING_KEYS
+from .config_api import (escape_next_key, get_configuration, ignore_key,
+                         _ENVIRON, _REPEATING_KEYS, _WINDOW_CONTEXT)
 from .lib import logger
 from .lib.key_context import KeyContext
 from .lib.logger import debug
-from .models.action import Action
+from .models.action import Action, PRESSED_ACTIONS
 from .models.combo import Combo, ComboHint
 from .models.trigger import Trigger
 from .models.key import Key
@@ -64,13 +65,14 @@ def none_pressed():
 
 
 def get_pressed_mods():
-    keys = [x.key for x in _key_states.values() if x.is_pressed()]
-    keys = [x for x in keys if Modifier.is_key_modifier(x)]
-    return [Modifier.from_key(key) for key in keys]
+    # runs for every key press, one pass and no intermediate lists
+    is_key_modifier = Modifier.is_key_modifier
+    return [Modifier.from_key(x.key) for x in _key_states.values()
+            if x.action in PRESSED_ACTIONS and is_key_modifier(x.key)]
 
 
 def get_pressed_states():
-    return [x for x in _key_states.values() if x.is_pressed()]
+    return [x for x in _key_states.values() if x.action in PRESSED_ACTIONS]
 
 
 def is_sticky(key):
@@ -192,11 +194,12 @@ def suspend_or_resuspend_keys(timeout):
 def suspend_keys(timeout):
     global _suspend_timer
     global _last_suspend_timeout
-    debug("suspending keys:", pressed_mods_not_exerted_on_output())
-    states: List[Keystate] = [x for x in _key_states.values() if x.is_pressed()]
+    if logger.VERBOSE:
+        debug("suspending keys:", pressed_mods_not_exerted_on_output())
+    states: List[Keystate] = [x for x in _key_states.values() if x.action in PRESSED_ACTIONS]
     for s in states:
         s.suspended = True
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     _last_suspend_timeout = timeout
     _suspend_timer = loop.call_later(timeout, resume_keys)
 
@@ -260,15 +263,19 @@ def apply_modmap(keystate: Keystate, context: KeyContext):
     # debug("active", active_modmap)
     conditional_modmaps: List[Modmap] = _MODMAPS[1:]
     # debug("conditionals", conditional_modmaps)
+    # read the plain `mappings` dicts directly, this runs on every key press
+    # and the Modmap dunders would add a Python call per lookup
     if conditional_modmaps:
         for modmap in conditional_modmaps:
-            if inkey in modmap:
+            if inkey in modmap.mappings:
                 if modmap.conditional(context):
                     active_modmap = modmap
                     break
-    if active_modmap and inkey in active_modmap:
-        debug(f"MODMAP: {inkey} => {active_modmap[inkey]} [{active_modmap.name}]")
-        keystate.key = active_modmap[inkey]
+    if active_modmap and inkey in active_modmap.mappings:
+        outkey = active_modmap.mappings[inkey]
+        if logger.VERBOSE:
+            debug(f"MODMAP: {inkey} => {outkey} [{active_modmap.name}]")
+        keystate.key = outkey
 
 
 def apply_multi_modmap(keystate: Keystate, context: KeyContext):
@@ -276,14 +283,15 @@ def apply_multi_modmap(keystate: Keystate, context: KeyContext):
     conditional_multimaps: List[MultiModmap] = _MULTI_MODMAPS[1:]
     if conditional_multimaps:
         for modmap in conditional_multimaps:
-            if keystate.inkey in modmap:
+            if keystate.inkey in modmap.mappings:
                 if modmap.conditional(context):
                     active_multi_modmap = modmap
                     break
 
     if active_multi_modmap:
-        if keystate.key in active_multi_modmap:
-            momentary, held, _ = active_multi_modmap[keystate.key]
+        mappings = active_multi_modmap.mappings
+        if keystate.key in mappings:
+            momentary, held, _ = mappings[keystate.key]
             keystate.key = momentary
             keystate.multikey = held
             keystate.is_multi = True
@@ -294,15 +302,15 @@ JUST_KEYS.extend([Key[x] for x in "QWERTYUIOPASDFGHJKLZXCVBNM"])
 
 
 # from .lib.benchit import *
-def find_keystate_or_new(inkey, action):
+def find_keystate_or_new(inkey, action, timestamp=None):
+    if timestamp is None:
+        timestamp = time.time()
     if inkey not in _key_states:
-        return Keystate(inkey=inkey, action=action)
+        return Keystate(inkey=inkey, action=action, time=timestamp)
 
     ks: Keystate = _key_states[inkey]
-    ks.prior = ks.copy()
-    delattr(ks.prior, "prior")
     ks.action = action
-    ks.time = time
+    ks.time = timestamp
     return ks
 
 
@@ -326,7 +334,8 @@ session_type    = _ENVIRON['session_type']
 wl_desktop_env  = _ENVIRON['wl_desktop_env']
 
 from .lib.window_context import WindowContextProvider
-window_context = WindowContextProvider(session_type, wl_desktop_env)
+window_context = WindowContextProvider(session_type, wl_desktop_env,
+                                        _WINDOW_CONTEXT['cache_ttl_ms'] / 1000)
 
 ignore_repeating_keys = _REPEATING_KEYS['ignore_repeating_keys']
 
@@ -367,11 +376,14 @@ def on_event(event: InputEvent, device):
 
     ks = find_keystate_or_new(
         inkey=key,
-        action=action
+        action=action,
+        # the kernel already stamped the event, no need to ask the clock again
+        timestamp=event.timestamp()
     )
 
-    debug()
-    debug(f"in {key} ({action})", ctx="II")
+    if logger.VERBOSE:
+        debug()
+        debug(f"in {key} ({action})", ctx="II")
 
     # if there is an X error (we don't have any window context)
     # then we turn off all mappings until it's resolved and act
@@ -395,7 +407,7 @@ def on_mod_key(keystate: Keystate, context):
 
     key, action = (keystate.key, keystate.action)
 
-    if action.is_pressed():
+    if action in PRESSED_ACTIONS:
         if none_pressed():
             should_suspend = True
 
@@ -543,8 +555,7 @@ def simple_sticky(combo: Combo, output_combo: Combo):
     if inkey in _key_states:
         ks: Keystate = _key_states[inkey]
         if ks.exerted_on_output:
-            key_in_output = any([inkey in mod.keys for mod in outmods])
-            if not key_in_output:
+            if inkey not in output_combo.modifier_keys:
                 # we are replacing the input key with the bound outkey, so if
                 # the input key is exerted on the output we should lift it
                 _output.send_key_action(inkey, Action.RELEASE)
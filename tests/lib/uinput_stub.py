@@ -17,5 +17,19 @@ class UInputStub:
     def keys(self):
         return [(x[2], x[1]) for x in self.queue if x[0] == EV_KEY]
 
+    def frames(self):
+        # keys grouped by the syn() that ended them, anything written
+        # after the last syn() shows up as a final frame of its own
+        frames, frame = [], []
+        for type, code, value in self.queue:
+            if type == EV_SYN:
+                frames.append(frame)
+                frame = []
+            elif type == EV_KEY:
+                frame.append((value, code))
+        if frame:
+            frames.append(frame)
+        return frames
+
     def close(self):
         pass  # NOP
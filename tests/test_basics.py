@@ -116,8 +116,11 @@ async def test_terminate_should_release_keys():
     press(Key.LEFT_SHIFT)
     press(Key.F)
 
-    with pytest.raises(SystemExit):
-        input.sig_term()
+    input._shutdown_event = asyncio.Event()
+    input.sig_term()
+    assert input._shutdown_event.is_set()
+    # what the main loop does once it wakes up on the shutdown event
+    input.shutdown()
 
     assert _out.keys() == [
         (PRESS, Key.LEFT_CTRL),
@@ -0,0 +1,118 @@
+import asyncio
+
+from inotify_simple import Event as inotify_Event
+from inotify_simple import flags
+
+from xwaykeyz import input
+
+
+class FakeDevice:
+    def __init__(self, fn):
+        self.fn = fn
+
+    # like evdev's InputDevice, equality ignores the open fd
+    def __eq__(self, other):
+        return self.fn == other.fn
+
+
+class FakeRegistry:
+    def __init__(self, *filenames):
+        self.devices = [FakeDevice(fn) for fn in filenames]
+        self.log = []
+
+    def __contains__(self, device):
+        return device in self.devices
+
+    def cares_about(self, device):
+        return True
+
+    def cares_about_path(self, filename):
+        return True
+
+    def grab(self, device):
+        self.log.append(("grab", device.fn))
+        self.devices.append(device)
+
+    def ungrab_by_filename(self, filename):
+        self.log.append(("ungrab", filename))
+        self.devices = [d for d in self.devices if d.fn != filename]
+
+
+class FakeINotify:
+    def __init__(self, events):
+        self._batches = [events]
+
+    def read(self, timeout=None):
+        return self._batches.pop(0) if self._batches else []
+
+
+def setup_function(module):
+    input._notify_events.clear()
+    input._attrib_waiters.clear()
+
+
+async def feed(registry, *masks, name="event5"):
+    inotify = FakeINotify([inotify_Event(1, mask, 0, name) for mask in masks])
+    input._inotify_handler(registry, inotify)
+    input._add_timer.cancel()
+    await input.device_change(registry, input._notify_events)
+
+
+async def test_replug_on_same_node_regrabs(monkeypatch):
+    monkeypatch.setattr(input, "InputDevice", FakeDevice)
+    registry = FakeRegistry("/dev/input/event5")
+
+    await feed(registry, flags.DELETE, flags.CREATE, flags.ATTRIB)
+
+    assert registry.log == [
+        ("ungrab", "/dev/input/event5"),
+        ("grab", "/dev/input/event5"),
+    ]
+
+
+async def test_unplug_only_ungrabs(monkeypatch):
+    monkeypatch.setattr(input, "InputDevice", FakeDevice)
+    registry = FakeRegistry("/dev/input/event5")
+
+    await feed(registry, flags.DELETE)
+
+    assert registry.log == [("ungrab", "/dev/input/event5")]
+
+
+async def test_new_node_is_grabbed_once(monkeypatch):
+    monkeypatch.setattr(input, "InputDevice", FakeDevice)
+    registry = FakeRegistry()
+
+    await feed(registry, flags.CREATE, flags.ATTRIB, flags.ATTRIB)
+
+    assert registry.log == [("grab", "/dev/input/event5")]
+
+
+class UnreadableNodeINotify:
+    def __init__(self):
+        self.fd = -1
+
+    def add_watch(self, path, mask):
+        raise PermissionError(13, "Permission denied", path)
+
+
+async def test_wait_for_attrib_on_unreadable_node(monkeypatch):
+    # a watch on the node itself fails exactly when we need to wait
+    monkeypatch.setattr(input, "INotify", UnreadableNodeINotify)
+    wait = asyncio.ensure_future(input._wait_for_attrib("/dev/input/event5", 5))
+    await asyncio.sleep(0)
+
+    # the /dev/input watcher sees udev fixing up the node
+    input._inotify_handler(FakeRegistry(), FakeINotify([
+        inotify_Event(1, flags.ATTRIB, 0, "event5"),
+    ]))
+    input._add_timer.cancel()
+
+    await asyncio.wait_for(wait, 0.1)
+    assert input._attrib_waiters == {}
+
+
+async def test_wait_for_attrib_times_out():
+    await input._wait_for_attrib("/dev/input/event5", 0.01)
+
+    assert input._attrib_waiters == {}
@@ -0,0 +1,181 @@
+import os
+import struct
+import time
+
+from evdev.ecodes import EV_KEY, EV_SYN, SYN_REPORT
+from lib.uinput_stub import UInputStub
+
+from xwaykeyz import output
+from xwaykeyz.config_api import _THROTTLES
+from xwaykeyz.models.action import PRESS, RELEASE
+from xwaykeyz.models.combo import Combo
+from xwaykeyz.models.key import Key
+from xwaykeyz.models.modifier import Modifier
+from xwaykeyz.output import Output, setup_uinput
+
+_out = None
+
+
+def setup_function(module):
+    global _out
+    _out = UInputStub()
+    setup_uinput(_out)
+
+
+def throttles(monkeypatch, pre, post):
+    monkeypatch.setitem(_THROTTLES, "key_pre_delay_ms", pre)
+    monkeypatch.setitem(_THROTTLES, "key_post_delay_ms", post)
+
+
+def record_sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(output, "sleep_ms", slept.append)
+    return slept
+
+
+def test_standalone_key_actions_are_one_frame_each():
+    o = Output()
+    o.send_key_action(Key.A, PRESS)
+    o.send_key_action(Key.A, RELEASE)
+
+    assert _out.frames() == [
+        [(PRESS, Key.A)],
+        [(RELEASE, Key.A)],
+    ]
+
+
+def test_combo_frames_without_throttles(monkeypatch):
+    throttles(monkeypatch, 0, 0)
+    slept = record_sleeps(monkeypatch)
+    o = Output()
+    o.send_key_action(Key.LEFT_CTRL, PRESS)
+    o.send_combo(Combo([Modifier.ALT], Key.TAB))
+
+    assert _out.frames() == [
+        [(PRESS, Key.LEFT_CTRL)],
+        # everything up to the hold on the combo key goes out together
+        [(RELEASE, Key.LEFT_CTRL), (PRESS, Key.LEFT_ALT), (PRESS, Key.TAB)],
+        [(RELEASE, Key.TAB), (RELEASE, Key.LEFT_ALT), (PRESS, Key.LEFT_CTRL)],
+    ]
+    assert slept == [6]
+
+
+def test_combo_frames_with_throttles(monkeypatch):
+    throttles(monkeypatch, 1, 2)
+    slept = record_sleeps(monkeypatch)
+    o = Output()
+    o.send_key_action(Key.LEFT_CTRL, PRESS)
+    o.send_combo(Combo([Modifier.ALT], Key.TAB))
+
+    # every key is spaced out, so every key is a frame of its own
+    assert _out.frames() == [
+        [(PRESS, Key.LEFT_CTRL)],
+        [(RELEASE, Key.LEFT_CTRL)],
+        [(PRESS, Key.LEFT_ALT)],
+        [(PRESS, Key.TAB)],
+        [(RELEASE, Key.TAB)],
+        [(RELEASE, Key.LEFT_ALT)],
+        [(PRESS, Key.LEFT_CTRL)],
+    ]
+    # post + pre delays between keys are slept in one go, the trailing
+    # post-delay is left to whatever is output next
+    assert slept == [1, 3, 3, 6, 3, 3]
+    assert o._resume_at > 0
+
+
+def test_next_output_waits_out_trailing_delay(monkeypatch):
+    throttles(monkeypatch, 0, 50)
+    record_sleeps(monkeypatch)
+    waited = []
+    monkeypatch.setattr(output.time, "sleep", waited.append)
+    o = Output()
+    o.send_combo(Combo([], Key.A))
+    o.send_key_action(Key.B, PRESS)
+
+    assert len(waited) == 1
+    assert 0 < waited[0] <= 0.05
+    assert o._resume_at == 0
+
+
+def test_trailing_delay_already_over_is_not_waited(monkeypatch):
+    waited = []
+    monkeypatch.setattr(output.time, "sleep", waited.append)
+    o = Output()
+    o._resume_at = time.monotonic() - 1
+    o.send_key_action(Key.B, PRESS)
+
+    assert waited == []
+    assert o._resume_at == 0
+
+
+def test_suspended_modifier_is_reexerted_once(monkeypatch):
+    throttles(monkeypatch, 0, 0)
+    record_sleeps(monkeypatch)
+    o = Output()
+    o.send_key_action(Key.LEFT_CTRL, PRESS)
+    with o.suspend_when_lifting():
+        o.send_combo(Combo([], Key.A))
+        # pressed again (real input) and lifted by the next combo as well
+        o.send_key_action(Key.LEFT_CTRL, PRESS)
+        o.send_combo(Combo([], Key.B))
+
+    assert _out.keys() == [
+        (PRESS, Key.LEFT_CTRL),
+        (RELEASE, Key.LEFT_CTRL),
+        (PRESS, Key.A),
+        (RELEASE, Key.A),
+        (PRESS, Key.LEFT_CTRL),
+        (RELEASE, Key.LEFT_CTRL),
+        (PRESS, Key.B),
+        (RELEASE, Key.B),
+        # only once, no matter how many combos lifted it
+        (PRESS, Key.LEFT_CTRL),
+    ]
+
+
+def read_events(fd):
+    data = os.read(fd, 65536)
+    size = output._INPUT_EVENT.size
+    assert len(data) % size == 0
+    return [output._INPUT_EVENT.unpack_from(data, i)[2:] for i in range(0, len(data), size)]
+
+
+def test_raw_frames_written_to_uinput_fd(monkeypatch):
+    throttles(monkeypatch, 0, 0)
+    record_sleeps(monkeypatch)
+    r, w = os.pipe()
+    monkeypatch.setattr(output, "_uinput_fd", w)
+    try:
+        o = Output()
+        o.send_key_action(Key.LEFT_CTRL, PRESS)
+        assert read_events(r) == [
+            (EV_KEY, Key.LEFT_CTRL, PRESS),
+            (EV_SYN, SYN_REPORT, 0),
+        ]
+
+        o.send_combo(Combo([Modifier.ALT], Key.TAB))
+        assert read_events(r) == [
+            (EV_KEY, Key.LEFT_CTRL, RELEASE),
+            (EV_KEY, Key.LEFT_ALT, PRESS),
+            (EV_KEY, Key.TAB, PRESS),
+            (EV_SYN, SYN_REPORT, 0),
+            (EV_KEY, Key.TAB, RELEASE),
+            (EV_KEY, Key.LEFT_ALT, RELEASE),
+            (EV_KEY, Key.LEFT_CTRL, PRESS),
+            (EV_SYN, SYN_REPORT, 0),
+        ]
+    finally:
+        os.close(r)
+        os.close(w)
+
+    # nothing went through the injected uinput object
+    assert _out.queue == []
+
+
+def test_raw_event_matches_struct_input_event():
+    # struct timeval (two longs) + __u16 type + __u16 code + __s32 value
+    if struct.calcsize("P") == 8:
+        assert output._INPUT_EVENT.size == 24
+    else:
+        assert output._INPUT_EVENT.size == 16
+    assert output._SYN_REPORT == output._INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0)